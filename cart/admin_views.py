@@ -1,11 +1,13 @@
 from rest_framework import viewsets, mixins
 
 from config.permissions import IsStaffUser
-from .models import Cart
+from core.export import ExportMixin
+from .models import Cart, CartItem
 from .admin_serializers import AdminCartSerializer
 
 
 class AdminCartViewSet(
+    ExportMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     viewsets.GenericViewSet,
@@ -15,3 +17,19 @@ class AdminCartViewSet(
     queryset = Cart.objects.select_related('user').prefetch_related(
         'items__product',
     ).all()
+    export_filename = 'carts'
+    export_fields = {
+        'cart_id': 'cart_id',
+        'user': 'cart__user__username',
+        'session_key': 'cart__session_key',
+        'product_id': 'product_id',
+        'product_name': 'product__name',
+        'quantity': 'quantity',
+        'size': 'size',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
+
+    def get_export_queryset(self):
+        """One row per cart item."""
+        return CartItem.objects.order_by('-cart__updated_at', 'pk')
@@ -0,0 +1,72 @@
+"""Move a guest's session cart to the user who just logged in."""
+from django.db import transaction
+
+from core import counters
+
+from .models import Cart, CartItem
+
+
+@transaction.atomic
+def merge_session_cart(session_key: str, user) -> dict:
+    """
+    Merge the carts of session_key into user's cart with a few bulk statements.
+
+    Lines the user does not have yet are moved over with one UPDATE. Lines
+    on the same (product, size) keep the larger quantity; the guest cart
+    is then deleted.
+    """
+    result = {'moved': 0, 'merged': 0}
+    if not session_key:
+        return result
+    guest_ids = list(
+        Cart.objects.select_for_update()
+        .filter(user=None, session_key=session_key)
+        .values_list('pk', flat=True)
+    )
+    if not guest_ids:
+        return result
+
+    user_cart = Cart.objects.select_for_update().filter(user=user).first()
+    if user_cart is None and len(guest_ids) == 1:
+        # Nothing to reconcile: hand the guest cart over as is.
+        Cart.objects.filter(pk=guest_ids[0]).update(user=user, session_key='')
+        result['moved'] = CartItem.objects.filter(cart_id=guest_ids[0]).count()
+        return result
+    if user_cart is None:
+        user_cart = Cart.objects.create(user=user, session_key='')
+
+    user_items = {
+        (i.product_id, i.size): i for i in CartItem.objects.filter(cart=user_cart)
+    }
+    to_move = {}
+    to_update = {}
+    # Newest first, so the latest guest line wins if several guest carts
+    # hold the same (product, size).
+    for pk, product_id, size, quantity in CartItem.objects.filter(
+        cart_id__in=guest_ids,
+    ).order_by('-updated_at').values_list('pk', 'product_id', 'size', 'quantity'):
+        key = (product_id, size)
+        if key in to_move:
+            continue
+        current = user_items.get(key)
+        if current is None:
+            to_move[key] = pk
+        elif quantity > current.quantity:
+            current.quantity = quantity
+            to_update[current.pk] = current
+
+    if to_move:
+        CartItem.objects.filter(pk__in=to_move.values()).update(cart=user_cart)
+    if to_update:
+        CartItem.objects.bulk_update(to_update.values(), ['quantity'])
+
+    non_empty = Cart.objects.filter(pk__in=guest_ids, has_items=True).count()
+    with counters.suspend_counters():
+        Cart.objects.filter(pk__in=guest_ids).delete()
+    counters.adjust({'carts': -non_empty})
+    if user_items or to_move:
+        counters.mark_cart(user_cart.pk, True)
+
+    result['moved'] = len(to_move)
+    result['merged'] = len(to_update)
+    return result
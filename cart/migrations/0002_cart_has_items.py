@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:39
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def backfill_has_items(apps, schema_editor):
+    Cart = apps.get_model('cart', 'Cart')
+    CartItem = apps.get_model('cart', 'CartItem')
+    Cart.objects.update(has_items=Exists(CartItem.objects.filter(cart=OuterRef('pk'))))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='has_items',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(backfill_has_items, migrations.RunPython.noop),
+    ]
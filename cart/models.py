@@ -11,6 +11,8 @@ class Cart(models.Model):
         related_name='carts'
     )
     session_key = models.CharField(max_length=40, blank=True, db_index=True)
+    # Maintained by core.signals so the dashboard can count non-empty carts
+    has_items = models.BooleanField(default=False, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
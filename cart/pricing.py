@@ -0,0 +1,74 @@
+"""Server-side cart totals, so the client needs no extra product fetches."""
+from decimal import Decimal
+
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce
+
+from orders.shipping import shipping_rates
+from products.inventory import live_stock
+
+from .models import CartItem
+
+ZERO = Decimal('0.00')
+
+
+def cart_summary(cart_id) -> dict:
+    """
+    Totals for a cart from one annotated query over its lines.
+
+    Savings compare against the products' original prices; stock warnings
+    list lines that are unavailable or exceed the stock. Sharded products
+    are checked against their live shard totals, not the periodically
+    refreshed Product.stock.
+    """
+    lines = []
+    if cart_id is not None:
+        lines = list(CartItem.objects.filter(cart_id=cart_id).annotate(
+            unit_price=F('product__price'),
+            unit_original=Coalesce('product__original_price', 'product__price'),
+            stock=F('product__stock'),
+            sharded=F('product__stock_sharded'),
+            available=Q(product__is_active=True),
+            name=F('product__name'),
+        ).values(
+            'id', 'product_id', 'quantity', 'unit_price', 'unit_original',
+            'stock', 'sharded', 'available', 'name',
+        ))
+        sharded = [line['product_id'] for line in lines if line['sharded']]
+        if sharded:
+            totals = live_stock(sharded)
+            for line in lines:
+                if line['sharded']:
+                    line['stock'] = totals.get(line['product_id'], 0)
+
+    item_count = 0
+    subtotal = ZERO
+    original_subtotal = ZERO
+    warnings = []
+    for line in lines:
+        quantity = line['quantity']
+        item_count += quantity
+        subtotal += line['unit_price'] * quantity
+        original_subtotal += max(line['unit_original'], line['unit_price']) * quantity
+        if not line['available']:
+            warnings.append({
+                'item_id': line['id'], 'product_id': str(line['product_id']),
+                'name': line['name'], 'issue': 'unavailable',
+            })
+        elif quantity > line['stock']:
+            warnings.append({
+                'item_id': line['id'], 'product_id': str(line['product_id']),
+                'name': line['name'], 'issue': 'insufficient_stock',
+                'requested': quantity, 'available': line['stock'],
+            })
+
+    rates = shipping_rates()
+    return {
+        'item_count': item_count,
+        'subtotal': str(subtotal),
+        'original_subtotal': str(original_subtotal),
+        'savings': str(original_subtotal - subtotal),
+        'shipping': {area: str(amount) for area, amount in rates.items()},
+        'total': {area: str(subtotal + amount) for area, amount in rates.items()},
+        'stock_warnings': warnings,
+    }
@@ -26,8 +26,33 @@ class CartAddSerializer(serializers.Serializer):
     quantity = serializers.IntegerField(min_value=1, default=1)
     size = serializers.CharField(max_length=20, allow_blank=True, default='')
 
-    def validate_product_id(self, value):
+    def validate(self, attrs):
+        from products.identity import get_product
+        product = get_product(attrs['product_id'])
+        if product is None:
+            raise serializers.ValidationError({'product_id': ['Product not found.']})
+        attrs['product'] = product
+        return attrs
+
+
+class CartSyncItemSerializer(serializers.Serializer):
+    product_id = serializers.UUIDField()
+    quantity = serializers.IntegerField(min_value=1)
+    size = serializers.CharField(max_length=20, allow_blank=True, default='')
+
+
+class CartSyncSerializer(serializers.Serializer):
+    """Full desired cart for PUT /api/cart/; later duplicates of a line win."""
+    items = CartSyncItemSerializer(many=True, max_length=200)
+
+    def validate_items(self, items):
         from products.models import Product
-        if not Product.objects.filter(id=value, is_active=True).exists():
-            raise serializers.ValidationError('Product not found.')
-        return value
+        ids = {item['product_id'] for item in items}
+        products = Product.objects.filter(id__in=ids, is_active=True).in_bulk()
+        missing = sorted(str(pid) for pid in ids - products.keys())
+        if missing:
+            raise serializers.ValidationError(f"Products not found: {', '.join(missing)}.")
+        for item in items:
+            item['product'] = products[item['product_id']]
+            item['size'] = (item.get('size') or '').strip()
+        return items
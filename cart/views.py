@@ -1,17 +1,39 @@
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.generics import RetrieveAPIView
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core import counters
 from meta_pixel.service import meta_conversions
-from products.models import Product
 
 from .models import Cart, CartItem
-from .serializers import CartAddSerializer, CartItemSerializer, CartSerializer
+from .pricing import cart_summary
+from .serializers import CartAddSerializer, CartItemSerializer, CartSerializer, CartSyncSerializer
+
+
+EMPTY_CART = {'id': None, 'items': [], 'created_at': None, 'updated_at': None}
+
+
+def get_cart(request):
+    """
+    Return the visitor's cart, or None if they have none yet.
+
+    Never writes: no session or Cart row is created, so read-only cart
+    traffic (first visits, crawlers) costs no database writes.
+    """
+    if request.user.is_authenticated:
+        return Cart.objects.filter(user=request.user).first()
+    session_key = request.session.session_key
+    if not session_key:
+        return None
+    return Cart.objects.filter(user=None, session_key=session_key).first()
 
 
 def get_or_create_cart(request):
+    """Return the visitor's cart, creating it (and the session) on first add."""
     if request.user.is_authenticated:
         cart, _ = Cart.objects.get_or_create(user=request.user, defaults={'session_key': ''})
     else:
@@ -23,16 +45,89 @@ def get_or_create_cart(request):
     return cart
 
 
+def _cart_with_items(pk):
+    return Cart.objects.prefetch_related(
+        'items__product', 'items__product__images',
+        'items__product__category', 'items__product__sub_category',
+    ).get(pk=pk)
+
+
 class CartDetailView(RetrieveAPIView):
     """Get current cart with items."""
     permission_classes = [AllowAny]
     serializer_class = CartSerializer
 
     def get_object(self):
-        cart = get_or_create_cart(self.request)
-        return Cart.objects.prefetch_related(
-            'items__product', 'items__product__images'
-        ).get(pk=cart.pk)
+        cart = get_cart(self.request)
+        if cart is None:
+            return None
+        return _cart_with_items(cart.pk)
+
+    def _render(self, cart):
+        """Cart payload plus server-side totals (see cart.pricing)."""
+        data = dict(EMPTY_CART) if cart is None else self.get_serializer(cart).data
+        data['summary'] = cart_summary(cart.pk if cart else None)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._render(self.get_object())
+
+    def put(self, request):
+        """
+        Replace the cart with the given lines in one transaction.
+
+        Body: {"items": [{"product_id": "...", "quantity": 2, "size": ""}]}.
+        Lines are keyed by (product, size); the difference to the stored
+        cart is applied with one bulk_create, one bulk_update and one delete.
+        """
+        ser = CartSyncSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        desired = {
+            (item['product_id'], item['size']): item
+            for item in ser.validated_data['items']
+        }
+
+        cart = get_or_create_cart(request) if desired else get_cart(request)
+        if cart is None:
+            return self._render(None)
+
+        added = []
+        with transaction.atomic():
+            # Serialise concurrent syncs of the same cart.
+            Cart.objects.select_for_update().filter(pk=cart.pk).first()
+            existing = {(i.product_id, i.size): i for i in cart.items.all()}
+
+            to_create = []
+            to_update = []
+            now = timezone.now()
+            for key, item in desired.items():
+                current = existing.get(key)
+                if current is None:
+                    to_create.append(CartItem(
+                        cart=cart, product=item['product'],
+                        quantity=item['quantity'], size=item['size'],
+                    ))
+                    added.append(item)
+                elif current.quantity != item['quantity']:
+                    current.quantity = item['quantity']
+                    current.updated_at = now
+                    to_update.append(current)
+            stale = [i.pk for key, i in existing.items() if key not in desired]
+
+            if to_create:
+                CartItem.objects.bulk_create(to_create)
+            if to_update:
+                CartItem.objects.bulk_update(to_update, ['quantity', 'updated_at'])
+            if stale:
+                with counters.suspend_counters():
+                    CartItem.objects.filter(pk__in=stale).delete()
+            # Bulk writes bypass the item signals that maintain this flag.
+            counters.mark_cart(cart.pk, bool(desired))
+
+        for item in added:
+            meta_conversions.track_add_to_cart(request, item['product'], item['quantity'])
+
+        return self._render(_cart_with_items(cart.pk))
 
 
 class CartAddView(APIView):
@@ -43,17 +138,14 @@ class CartAddView(APIView):
         ser = CartAddSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
         cart = get_or_create_cart(request)
-        product = Product.objects.get(id=ser.validated_data['product_id'])
+        product = ser.validated_data['product']
         quantity = ser.validated_data['quantity']
         size = (ser.validated_data.get('size') or '').strip()
 
-        item, created = CartItem.objects.update_or_create(
+        item, _ = CartItem.objects.update_or_create(
             cart=cart, product=product, size=size,
             defaults={'quantity': quantity}
         )
-        if not created:
-            item.quantity = quantity
-            item.save(update_fields=['quantity', 'updated_at'])
 
         meta_conversions.track_add_to_cart(request, product, quantity)
 
@@ -68,11 +160,11 @@ class CartUpdateView(APIView):
     permission_classes = [AllowAny]
 
     def patch(self, request, item_id):
-        cart = get_or_create_cart(request)
+        cart = get_cart(request)
         quantity = request.data.get('quantity')
         if quantity is None or not isinstance(quantity, int) or quantity < 1:
             return Response({'quantity': ['Must be a positive integer.']}, status=400)
-        item = CartItem.objects.filter(cart=cart, id=item_id).first()
+        item = CartItem.objects.filter(cart=cart, id=item_id).first() if cart else None
         if not item:
             return Response({'detail': 'Not found.'}, status=404)
         item.quantity = quantity
@@ -85,7 +177,9 @@ class CartRemoveView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request, item_id):
-        cart = get_or_create_cart(request)
+        cart = get_cart(request)
+        if cart is None:
+            return Response({'status': 'removed', 'deleted': False})
         deleted, _ = CartItem.objects.filter(cart=cart, id=item_id).delete()
         return Response({'status': 'removed', 'deleted': deleted > 0})
 
@@ -95,7 +189,9 @@ class CartRemoveByProductView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request, product_id):
-        cart = get_or_create_cart(request)
+        cart = get_cart(request)
+        if cart is None:
+            return Response({'status': 'removed', 'deleted': False})
         deleted, _ = CartItem.objects.filter(cart=cart, product_id=product_id).delete()
         return Response({'status': 'removed', 'deleted': deleted > 0})
 
@@ -105,6 +201,8 @@ class CartClearView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
-        cart = get_or_create_cart(request)
+        cart = get_cart(request)
+        if cart is None:
+            return Response({'status': 'cleared', 'deleted': 0})
         deleted, _ = cart.items.all().delete()
         return Response({'status': 'cleared', 'deleted': deleted})
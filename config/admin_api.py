@@ -1,67 +1,80 @@
-from decimal import Decimal
+from collections import defaultdict
 from datetime import date, timedelta
 
-from django.db.models import Sum, Count, Q
-from django.db.models.functions import TruncDate, TruncWeek, TruncMonth
 from django.utils import timezone
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 
 from config.permissions import IsStaffUser
-from core.models import DashboardBranding
-from orders.models import Order
+from core.counters import from_minor, read_counters
+from core.models import DailyMetric, DashboardBranding
+from core.rollups import bucketed, daily_values
+from orders.analytics import GROUP_BY_CHOICES, get_sales_facts
+from orders.models import Order, with_items_count
 from orders.admin_serializers import AdminOrderListSerializer
-from products.models import Product, NavbarCategory, Category, Brand
-from contact.models import ContactSubmission
-from notifications.models import Notification
-from cart.models import Cart, CartItem
-from wishlist.models import WishlistItem
+
+
+def _parse_date_range(request) -> tuple[date, date]:
+    """Parse start/end date from query params, defaulting to the last 30 days."""
+    today = timezone.localdate()
+    default_start = today - timedelta(days=29)
+
+    start_str = request.query_params.get('start_date')
+    end_str = request.query_params.get('end_date')
+
+    start_date = default_start
+    end_date = today
+
+    try:
+        if start_str:
+            start_date = date.fromisoformat(start_str)
+        if end_str:
+            end_date = date.fromisoformat(end_str)
+    except ValueError:
+        # Fallback silently to defaults on parsing errors.
+        start_date = default_start
+        end_date = today
+
+    if start_date > end_date:
+        start_date, end_date = end_date, start_date
+
+    return start_date, end_date
 
 
 class DashboardStatsView(APIView):
+    """
+    Dashboard totals read from the incrementally maintained counters
+    (core.counters) in one query, plus the ten most recent orders.
+    """
     permission_classes = [IsStaffUser]
 
     def get(self, request):
-        order_counts = Order.objects.aggregate(
-            total_count=Count('id'),
-            pending_count=Count('id', filter=Q(status=Order.Status.PENDING)),
-            confirmed_count=Count('id', filter=Q(status=Order.Status.CONFIRMED)),
-            cancelled_count=Count('id', filter=Q(status=Order.Status.CANCELLED)),
-        )
-        revenue_agg = Order.objects.exclude(
-            status=Order.Status.CANCELLED,
-        ).aggregate(revenue=Sum('total'))
-
-        product_stats = Product.objects.aggregate(
-            total_count=Count('id'),
-            active_count=Count('id', filter=Q(is_active=True)),
-            oos_count=Count('id', filter=Q(stock=0, is_active=True)),
-        )
-
-        recent_orders = Order.objects.prefetch_related('items__product')[:10]
+        values = read_counters()
+        recent_orders = with_items_count(Order.objects.all())[:10]
 
         return Response({
             'orders': {
-                'total': order_counts['total_count'],
-                'pending': order_counts['pending_count'],
-                'confirmed': order_counts['confirmed_count'],
-                'cancelled': order_counts['cancelled_count'],
+                'total': values.get('orders.total', 0),
+                'pending': values.get('orders.pending', 0),
+                'confirmed': values.get('orders.confirmed', 0),
+                'cancelled': values.get('orders.cancelled', 0),
             },
-            'revenue': str(revenue_agg['revenue'] or Decimal('0.00')),
+            'revenue': str(from_minor(values.get('revenue', 0))),
             'products': {
-                'total': product_stats['total_count'],
-                'active': product_stats['active_count'],
-                'out_of_stock': product_stats['oos_count'],
+                'total': values.get('products.total', 0),
+                'active': values.get('products.active', 0),
+                'out_of_stock': values.get('products.out_of_stock', 0),
             },
-            'categories': NavbarCategory.objects.count(),
-            'subcategories': Category.objects.count(),
-            'brands': Brand.objects.count(),
-            'contacts': ContactSubmission.objects.count(),
-            'notifications': Notification.objects.filter(is_active=True).count(),
-            # Count only carts that actually have at least one item
-            'carts': Cart.objects.filter(items__isnull=False).distinct().count(),
-            'wishlist': WishlistItem.objects.count(),
+            'categories': values.get('categories', 0),
+            'subcategories': values.get('subcategories', 0),
+            'brands': values.get('brands', 0),
+            'contacts': values.get('contacts', 0),
+            'notifications': values.get('notifications', 0),
+            # Carts that hold at least one item
+            'carts': values.get('carts', 0),
+            'wishlist': values.get('wishlist', 0),
             'recent_orders': AdminOrderListSerializer(recent_orders, many=True).data,
         })
 
@@ -76,133 +89,59 @@ class DashboardAnalyticsView(APIView):
 
     permission_classes = [IsStaffUser]
 
-    def _parse_date_range(self, request) -> tuple[date, date]:
-        """Parse start/end date from query params, defaulting to the last 30 days."""
-        today = timezone.localdate()
-        default_start = today - timedelta(days=29)
-
-        start_str = request.query_params.get('start_date')
-        end_str = request.query_params.get('end_date')
-
-        start_date = default_start
-        end_date = today
-
-        try:
-            if start_str:
-                start_date = date.fromisoformat(start_str)
-            if end_str:
-                end_date = date.fromisoformat(end_str)
-        except ValueError:
-            # Fallback silently to defaults on parsing errors.
-            start_date = default_start
-            end_date = today
-
-        if start_date > end_date:
-            start_date, end_date = end_date, start_date
-
-        return start_date, end_date
-
-    def _get_bucket_func(self, bucket: str):
-        bucket = (bucket or "day").lower()
-        if bucket == "week":
-            return TruncWeek
-        if bucket == "month":
-            return TruncMonth
-        return TruncDate
-
     def get(self, request):
-        start_date, end_date = self._parse_date_range(request)
+        start_date, end_date = _parse_date_range(request)
         bucket = request.query_params.get('bucket', 'day')
-        bucket_func = self._get_bucket_func(bucket)
-
-        # Filter base querysets by date range (inclusive).
-        order_qs = Order.objects.filter(
-            created_at__date__gte=start_date,
-            created_at__date__lte=end_date,
-        )
-        product_qs = Product.objects.filter(
-            created_at__date__gte=start_date,
-            created_at__date__lte=end_date,
-        )
-        cart_item_qs = CartItem.objects.filter(
-            created_at__date__gte=start_date,
-            created_at__date__lte=end_date,
-        )
-        wishlist_qs = WishlistItem.objects.filter(
-            created_at__date__gte=start_date,
-            created_at__date__lte=end_date,
-        )
-        contact_qs = ContactSubmission.objects.filter(
-            created_at__date__gte=start_date,
-            created_at__date__lte=end_date,
-        )
+        bucket_key = (bucket or "day").lower()
+        if bucket_key not in ("week", "month"):
+            bucket_key = "day"
+
+        # Closed days come from the DailyMetric rollups, recent days are
+        # computed live with a created_at range; see core.rollups.
+        buckets = bucketed(daily_values(start_date, end_date), bucket_key)
+
+        def _entry(label_str, metrics):
+            return {
+                'label': label_str,
+                'orders': metrics[DailyMetric.Metric.ORDERS][0],
+                'products': metrics[DailyMetric.Metric.PRODUCTS][0],
+                'cartItems': metrics[DailyMetric.Metric.CART_ITEMS][0],
+                'wishlistItems': metrics[DailyMetric.Metric.WISHLIST_ITEMS][0],
+                'contacts': metrics[DailyMetric.Metric.CONTACTS][0],
+                'units': metrics[DailyMetric.Metric.UNITS][0],
+                'revenue': str(from_minor(metrics[DailyMetric.Metric.ORDERS][1])),
+            }
+
+        totals = defaultdict(lambda: [0, 0])
+        for metrics in buckets.values():
+            for metric, (count, amount) in metrics.items():
+                totals[metric][0] += count
+                totals[metric][1] += amount
 
         summary = {
-            'totalOrders': order_qs.count(),
-            'totalProducts': product_qs.count(),
-            'totalCartItems': cart_item_qs.count(),
-            'totalWishlistItems': wishlist_qs.count(),
-            'totalContacts': contact_qs.count(),
+            'totalOrders': totals[DailyMetric.Metric.ORDERS][0],
+            'totalProducts': totals[DailyMetric.Metric.PRODUCTS][0],
+            'totalCartItems': totals[DailyMetric.Metric.CART_ITEMS][0],
+            'totalWishlistItems': totals[DailyMetric.Metric.WISHLIST_ITEMS][0],
+            'totalContacts': totals[DailyMetric.Metric.CONTACTS][0],
+            'totalUnits': totals[DailyMetric.Metric.UNITS][0],
+            'totalRevenue': str(from_minor(totals[DailyMetric.Metric.ORDERS][1])),
         }
 
-        # Build time-series across all entities keyed by bucket label.
-        series_map: dict[str, dict] = {}
-
-        def _update_series(qs, key: str):
-            for row in qs.annotate(
-                period=bucket_func('created_at')
-            ).values('period').annotate(total=Count('id')).order_by('period'):
-                period = row['period']
-                if period is None:
-                    continue
-                # Normalize to ISO date string for frontend.
-                label = getattr(period, 'date', lambda: period)()
-                label_str = label.isoformat()
-                entry = series_map.setdefault(
-                    label_str,
-                    {
-                        'label': label_str,
-                        'orders': 0,
-                        'products': 0,
-                        'cartItems': 0,
-                        'wishlistItems': 0,
-                        'contacts': 0,
-                    },
-                )
-                entry[key] = row['total']
-
-        _update_series(order_qs, 'orders')
-        _update_series(product_qs, 'products')
-        _update_series(cart_item_qs, 'cartItems')
-        _update_series(wishlist_qs, 'wishlistItems')
-        _update_series(contact_qs, 'contacts')
-
-        # Sort existing buckets.
-        series = sorted(series_map.values(), key=lambda x: x['label'])
-
-        # Ensure full date coverage for day bucket by filling gaps with zeros.
-        if (bucket or "day").lower() == "day":
-            filled_series = []
+        if bucket_key == "day":
+            # Full date coverage for the day bucket, gaps filled with zeros.
+            empty = defaultdict(lambda: [0, 0])
+            series = []
             current = start_date
-            end_inclusive = end_date
-            by_label = {entry['label']: entry for entry in series}
-
-            while current <= end_inclusive:
-                label_str = current.isoformat()
-                entry = by_label.get(label_str)
-                if not entry:
-                    entry = {
-                        'label': label_str,
-                        'orders': 0,
-                        'products': 0,
-                        'cartItems': 0,
-                        'wishlistItems': 0,
-                        'contacts': 0,
-                    }
-                filled_series.append(entry)
+            while current <= end_date:
+                series.append(_entry(current.isoformat(), buckets.get(current, empty)))
                 current += timedelta(days=1)
-
-            series = filled_series
+        else:
+            series = [
+                _entry(period.isoformat(), buckets[period])
+                for period in sorted(buckets)
+                if any(count for count, _ in buckets[period].values())
+            ]
 
         return Response({
             'summary': summary,
@@ -215,6 +154,52 @@ class DashboardAnalyticsView(APIView):
         })
 
 
+class SalesAnalyticsView(APIView):
+    """
+    Revenue grouped by district, product, subcategory or hour of day.
+
+    Query params: group_by (default district), start_date, end_date,
+    limit. Served from the in-memory fact cache in orders.analytics.
+    """
+
+    permission_classes = [IsStaffUser]
+
+    def get(self, request):
+        group_by = (request.query_params.get('group_by') or 'district').strip().lower()
+        if group_by not in GROUP_BY_CHOICES:
+            raise ValidationError({'group_by': f"Must be one of: {', '.join(GROUP_BY_CHOICES)}."})
+        try:
+            limit = max(0, int(request.query_params.get('limit') or 0))
+        except ValueError:
+            limit = 0
+        start_date, end_date = _parse_date_range(request)
+
+        rows = get_sales_facts().revenue_by(group_by, start_date, end_date, limit=limit or None)
+        return Response({
+            'results': rows,
+            'meta': {
+                'group_by': group_by,
+                'start_date': start_date.isoformat(),
+                'end_date': end_date.isoformat(),
+            },
+        })
+
+
+class OrderValueAnalyticsView(APIView):
+    """Average order value, order value percentiles and basket-size distribution."""
+
+    permission_classes = [IsStaffUser]
+
+    def get(self, request):
+        start_date, end_date = _parse_date_range(request)
+        data = get_sales_facts().order_values(start_date, end_date)
+        data['meta'] = {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+        }
+        return Response(data)
+
+
 def _get_branding_response(request, instance):
     """Build branding JSON for API response."""
     logo_url = None
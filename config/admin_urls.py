@@ -15,7 +15,13 @@ from cart.admin_views import AdminCartViewSet
 from wishlist.admin_views import AdminWishlistItemViewSet
 from core.admin_views import AdminActivityLogViewSet
 
-from .admin_api import DashboardStatsView, BrandingView, DashboardAnalyticsView
+from .admin_api import (
+    BrandingView,
+    DashboardAnalyticsView,
+    DashboardStatsView,
+    OrderValueAnalyticsView,
+    SalesAnalyticsView,
+)
 
 router = DefaultRouter()
 router.register(r'orders', AdminOrderViewSet, basename='admin-orders')
@@ -33,6 +39,8 @@ router.register(r'activities', AdminActivityLogViewSet, basename='admin-activiti
 urlpatterns = [
     path('stats/', DashboardStatsView.as_view(), name='admin-dashboard-stats'),
     path('analytics/overview/', DashboardAnalyticsView.as_view(), name='admin-dashboard-analytics'),
+    path('analytics/sales/', SalesAnalyticsView.as_view(), name='admin-sales-analytics'),
+    path('analytics/order-values/', OrderValueAnalyticsView.as_view(), name='admin-order-value-analytics'),
     path('branding/', BrandingView.as_view(), name='admin-branding'),
     path('', include(router.urls)),
 ]
@@ -0,0 +1,49 @@
+import logging
+
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.views import TokenObtainPairView
+
+from cart.merge import merge_session_cart
+from wishlist.merge import merge_session_wishlist
+
+logger = logging.getLogger(__name__)
+
+
+def merge_guest_data(request, user) -> dict:
+    """Move the current session's guest cart and wishlist to user."""
+    session_key = request.session.session_key
+    return {
+        'cart': merge_session_cart(session_key, user),
+        'wishlist': merge_session_wishlist(session_key, user),
+    }
+
+
+class LoginView(TokenObtainPairView):
+    """
+    Obtain a JWT pair and merge the visitor's guest cart and wishlist into
+    the account. A failed merge never fails the login.
+    """
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        try:
+            merge_guest_data(request, serializer.user)
+        except Exception:
+            logger.exception("Guest cart/wishlist merge failed for user %s", serializer.user.pk)
+        return Response(serializer.validated_data)
+
+
+class GuestMergeView(APIView):
+    """Explicitly merge the session's guest cart and wishlist into the logged-in user."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        return Response(merge_guest_data(request, request.user))
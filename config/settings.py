@@ -51,6 +51,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'products.identity.ProductIdentityMapMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -132,6 +133,11 @@ if railway_domain and railway_domain != '*':
     if railway_url not in CSRF_TRUSTED_ORIGINS:
         CSRF_TRUSTED_ORIGINS.append(railway_url)
 
+# Number of reverse proxies in front of the app that append to X-Forwarded-For
+# (Railway's edge is one). Client IPs used for rate limiting are taken from
+# that hop, never from the client-supplied part of the header.
+TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', '1' if railway_domain else '0'))
+
 # Security settings
 SECURE_SSL_REDIRECT = False
 USE_HTTPS = os.environ.get('USE_HTTPS', 'True').lower() == 'true'
@@ -149,7 +155,27 @@ CSRF_COOKIE_DOMAIN=os.environ.get('CSRF_COOKIE_DOMAIN', '')
 SESSION_COOKIE_SECURE = USE_HTTPS
 SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SAMESITE = 'None'
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# With a shared cache (REDIS_URL) sessions are served from a process-local
+# LRU and the cache, and only real changes are written to the database
+# (core.sessions). Without one, fall back to plain database sessions.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+    SESSION_ENGINE = 'core.sessions'
+else:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+SESSION_LOCAL_CACHE_TTL = int(os.environ.get('SESSION_LOCAL_CACHE_TTL', '5'))
+SESSION_LOCAL_CACHE_SIZE = int(os.environ.get('SESSION_LOCAL_CACHE_SIZE', '10000'))
+# How stale a local session copy may be before its version token is re-read
+# from the shared cache (0 = on every request)
+SESSION_VERSION_CHECK_INTERVAL = float(os.environ.get('SESSION_VERSION_CHECK_INTERVAL', '1'))
+# Minimum seconds between database writes of an unchanged session
+SESSION_REFRESH_INTERVAL = int(os.environ.get('SESSION_REFRESH_INTERVAL', '300'))
 
 # Additional Security
 SECURE_BROWSER_XSS_FILTER = True
@@ -162,6 +188,42 @@ ADMIN_URL_PATH = os.environ.get('ADMIN_URL_PATH', 'admin/')
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Number of StockShard rows created when a product is switched to sharded stock
+STOCK_SHARD_COUNT = int(os.environ.get('STOCK_SHARD_COUNT', '8'))
+
+# Orders older than this are moved to the archive tables by `archive_orders`
+ORDER_ARCHIVE_AFTER_DAYS = int(os.environ.get('ORDER_ARCHIVE_AFTER_DAYS', '365'))
+
+# In-memory sales fact cache behind /api/admin/analytics/sales/ and
+# /api/admin/analytics/order-values/: incremental top-up and full rebuild intervals
+# (both run in a background thread; requests keep reading the previous facts)
+ANALYTICS_REFRESH_SECONDS = int(os.environ.get('ANALYTICS_REFRESH_SECONDS', '60'))
+ANALYTICS_FULL_REFRESH_SECONDS = int(os.environ.get('ANALYTICS_FULL_REFRESH_SECONDS', '3600'))
+
+# Admin activity log entries are written synchronously; set
+# ACTIVITY_LOG_BUFFERED=true to queue and bulk-insert them (core.activity),
+# at the cost of losing queued entries if a worker is killed
+ACTIVITY_LOG_BUFFERED = os.environ.get('ACTIVITY_LOG_BUFFERED', 'false').lower() == 'true'
+ACTIVITY_LOG_BUFFER_SIZE = int(os.environ.get('ACTIVITY_LOG_BUFFER_SIZE', '100'))
+ACTIVITY_LOG_FLUSH_INTERVAL = float(os.environ.get('ACTIVITY_LOG_FLUSH_INTERVAL', '2'))
+# Cap on entries held for retry while the database cannot be written
+ACTIVITY_LOG_MAX_PENDING = int(os.environ.get('ACTIVITY_LOG_MAX_PENDING', '10000'))
+
+# Dashboard counter deltas (core.counters) are summed in process and written
+# every DASHBOARD_COUNTERS_FLUSH_INTERVAL seconds instead of inside each
+# checkout's transaction; set DASHBOARD_COUNTERS_BUFFERED=false to write on commit
+DASHBOARD_COUNTERS_BUFFERED = os.environ.get('DASHBOARD_COUNTERS_BUFFERED', 'true').lower() == 'true'
+DASHBOARD_COUNTERS_FLUSH_INTERVAL = float(os.environ.get('DASHBOARD_COUNTERS_FLUSH_INTERVAL', '2'))
+
+# Retention periods (days) used by `apply_retention`; see core.retention
+RETENTION_DAYS = {
+    'carts': int(os.environ.get('RETENTION_CART_DAYS', '30')),
+    'wishlist': int(os.environ.get('RETENTION_WISHLIST_DAYS', '90')),
+    'sessions': 0,
+    'contacts': int(os.environ.get('RETENTION_CONTACT_DAYS', '365')),
+    'activity': int(os.environ.get('RETENTION_ACTIVITY_DAYS', '365')),
+}
+
 # =============================================================================
 # CLOUDFLARE R2 STORAGE
 # =============================================================================
@@ -208,6 +270,43 @@ META_ACCESS_TOKEN = os.environ.get('META_ACCESS_TOKEN', '')
 META_API_VERSION = os.environ.get('META_API_VERSION', 'v25.0')
 # Set META_TEST_EVENT_CODE during testing to route events to the Test Events tool
 META_TEST_EVENT_CODE = os.environ.get('META_TEST_EVENT_CODE', '')
+# 'dispatcher': sent by in-process worker threads (no extra process to run);
+# 'outbox': stored in MetaEventOutbox and sent by `manage.py meta_dispatch`
+# (durable, survives restarts) - only set this when that worker is deployed
+META_EVENT_DELIVERY = os.environ.get('META_EVENT_DELIVERY', 'dispatcher')
+# Point at a local stub server to test delivery
+META_API_BASE_URL = os.environ.get('META_API_BASE_URL', 'https://graph.facebook.com')
+
+# Batching dispatcher (meta_pixel.dispatcher): worker threads, queue bound,
+# events per request (Graph API max 1000) and max wait before a partial batch is sent
+META_DISPATCH_WORKERS = int(os.environ.get('META_DISPATCH_WORKERS', '2'))
+META_DISPATCH_QUEUE_SIZE = int(os.environ.get('META_DISPATCH_QUEUE_SIZE', '5000'))
+META_DISPATCH_BATCH_SIZE = int(os.environ.get('META_DISPATCH_BATCH_SIZE', '100'))
+META_DISPATCH_FLUSH_INTERVAL = float(os.environ.get('META_DISPATCH_FLUSH_INTERVAL', '2'))
+META_DISPATCH_TIMEOUT = float(os.environ.get('META_DISPATCH_TIMEOUT', '5'))
+META_DISPATCH_MAX_ATTEMPTS = int(os.environ.get('META_DISPATCH_MAX_ATTEMPTS', '5'))
+# Requests slower than this count as failures for the circuit breaker
+META_DISPATCH_SLOW_SECONDS = float(os.environ.get('META_DISPATCH_SLOW_SECONDS', '2'))
+META_BREAKER_THRESHOLD = int(os.environ.get('META_BREAKER_THRESHOLD', '5'))
+META_BREAKER_RESET_SECONDS = float(os.environ.get('META_BREAKER_RESET_SECONDS', '30'))
+# Outbox retry backoff (doubles per attempt, capped) and how long delivered/failed rows are kept
+META_OUTBOX_BACKOFF_SECONDS = float(os.environ.get('META_OUTBOX_BACKOFF_SECONDS', '30'))
+META_OUTBOX_BACKOFF_MAX_SECONDS = float(os.environ.get('META_OUTBOX_BACKOFF_MAX_SECONDS', '3600'))
+META_OUTBOX_KEEP_SENT_HOURS = int(os.environ.get('META_OUTBOX_KEEP_SENT_HOURS', '24'))
+META_OUTBOX_KEEP_FAILED_DAYS = int(os.environ.get('META_OUTBOX_KEEP_FAILED_DAYS', '7'))
+
+# Event governor (meta_pixel.governor): Search keystrokes within the debounce
+# window collapse into the final query, ViewContent is sent once per product
+# per visitor per window, sample rates keep a fraction of visitors per event
+# and governed events are capped per client IP per minute (0 = no cap)
+META_SEARCH_DEBOUNCE_SECONDS = float(os.environ.get('META_SEARCH_DEBOUNCE_SECONDS', '3'))
+META_VIEW_CONTENT_DEDUP_SECONDS = int(os.environ.get('META_VIEW_CONTENT_DEDUP_SECONDS', '1800'))
+META_EVENT_SAMPLE_RATES = {
+    'Search': float(os.environ.get('META_SEARCH_SAMPLE_RATE', '1')),
+    'ViewContent': float(os.environ.get('META_VIEW_CONTENT_SAMPLE_RATE', '1')),
+}
+META_EVENT_RATE_LIMIT = int(os.environ.get('META_EVENT_RATE_LIMIT', '120'))
+META_GOVERNOR_MAX_ENTRIES = int(os.environ.get('META_GOVERNOR_MAX_ENTRIES', '50000'))
 
 
 # =============================================================================
@@ -3,8 +3,9 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.views import TokenRefreshView
 
+from config.auth_views import GuestMergeView, LoginView
 from products.urls import (
     navbar_category_urlpatterns,
     category_urlpatterns,
@@ -15,8 +16,9 @@ from products.urls import (
 urlpatterns = [
     path(settings.ADMIN_URL_PATH, admin.site.urls),
     # Auth (JWT)
-    path('api/auth/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/auth/token/', LoginView.as_view(), name='token_obtain_pair'),
     path('api/auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/auth/merge-guest/', GuestMergeView.as_view(), name='merge_guest'),
     # Admin API
     path('api/admin/', include('config.admin_urls')),
     # Public API
@@ -2,12 +2,14 @@ from rest_framework import viewsets, mixins
 
 from config.permissions import IsStaffUser
 from core.activity import log_activity
+from core.export import ExportMixin
 from core.models import ActivityLog
 from .models import ContactSubmission
 from .admin_serializers import AdminContactSubmissionSerializer
 
 
 class AdminContactSubmissionViewSet(
+    ExportMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.DestroyModelMixin,
@@ -16,6 +18,15 @@ class AdminContactSubmissionViewSet(
     permission_classes = [IsStaffUser]
     serializer_class = AdminContactSubmissionSerializer
     queryset = ContactSubmission.objects.all()
+    export_filename = 'contacts'
+    export_fields = {
+        'id': 'id',
+        'name': 'name',
+        'phone': 'phone',
+        'email': 'email',
+        'message': 'message',
+        'created_at': 'created_at',
+    }
 
     def perform_destroy(self, instance):
         pk = instance.pk
@@ -1,13 +1,34 @@
+"""
+Admin activity logging.
+
+log_activity() does not write synchronously: entries are queued in process
+when the surrounding transaction commits (so rolled-back mutations log
+nothing, as before) and written with bulk_create once the buffer reaches
+ACTIVITY_LOG_BUFFER_SIZE entries, every ACTIVITY_LOG_FLUSH_INTERVAL seconds
+from a background thread, and at interpreter exit. If a bulk insert fails
+the rows are saved one by one; when none of them can be written (e.g. the
+database is unreachable) they are queued again, up to
+ACTIVITY_LOG_MAX_PENDING entries. Entries still queued when a worker is
+killed outright are lost, so buffering is opt-in: ACTIVITY_LOG_BUFFERED
+defaults to False, which writes each entry synchronously.
+"""
 from __future__ import annotations
 
+import atexit
+import logging
+import threading
 from typing import Any
 
+from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from django.db import connection, transaction
 
 from .models import ActivityLog
 
+logger = logging.getLogger(__name__)
 
-def log_activity(
+
+def build_activity_log(
     *,
     request,
     action: str,
@@ -15,12 +36,13 @@ def log_activity(
     entity_id: str | int | None = None,
     summary: str,
     metadata: dict[str, Any] | None = None,
-) -> None:
+) -> ActivityLog:
+    """Return an unsaved ActivityLog, e.g. for ActivityLog.objects.bulk_create."""
     actor = getattr(request, "user", None)
     if isinstance(actor, AnonymousUser):
         actor = None
 
-    ActivityLog.objects.create(
+    return ActivityLog(
         actor=actor if getattr(actor, "is_authenticated", False) else None,
         action=action,
         entity_type=entity_type,
@@ -29,3 +51,113 @@ def log_activity(
         metadata=metadata or {},
     )
 
+
+def log_activity(
+    *,
+    request,
+    action: str,
+    entity_type: str,
+    entity_id: str | int | None = None,
+    summary: str,
+    metadata: dict[str, Any] | None = None,
+) -> None:
+    entry = build_activity_log(
+        request=request,
+        action=action,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        summary=summary,
+        metadata=metadata,
+    )
+    if not getattr(settings, "ACTIVITY_LOG_BUFFERED", False):
+        entry.save()
+        return
+    # Runs immediately outside atomic blocks, after commit inside them.
+    transaction.on_commit(lambda: activity_buffer.add(entry))
+
+
+class ActivityLogBuffer:
+    """Thread-safe in-process queue of unsaved ActivityLog rows."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: list[ActivityLog] = []
+        self._flusher: threading.Thread | None = None
+        self._wakeup = threading.Event()
+
+    @property
+    def max_size(self) -> int:
+        return max(1, int(getattr(settings, "ACTIVITY_LOG_BUFFER_SIZE", 100)))
+
+    @property
+    def max_pending(self) -> int:
+        return max(self.max_size, int(getattr(settings, "ACTIVITY_LOG_MAX_PENDING", 10000)))
+
+    @property
+    def interval(self) -> float:
+        return float(getattr(settings, "ACTIVITY_LOG_FLUSH_INTERVAL", 2.0))
+
+    def add(self, entry: ActivityLog) -> None:
+        with self._lock:
+            self._entries.append(entry)
+            full = len(self._entries) >= self.max_size
+            self._ensure_flusher()
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all queued entries; returns how many were written."""
+        with self._lock:
+            entries, self._entries = self._entries, []
+        if not entries:
+            return 0
+        try:
+            ActivityLog.objects.bulk_create(entries, batch_size=500)
+        except Exception:
+            logger.exception("Bulk insert of %d activity log entries failed; saving one by one", len(entries))
+            return self._save_each(entries)
+        return len(entries)
+
+    def _save_each(self, entries: list[ActivityLog]) -> int:
+        """Fallback for a failed bulk insert; returns how many rows were saved."""
+        failed = []
+        for entry in entries:
+            try:
+                entry.save()
+            except Exception:
+                failed.append(entry)
+        saved = len(entries) - len(failed)
+        if not failed:
+            return saved
+        if saved:
+            # Other rows went through, so these are bad rows rather than a bad database.
+            logger.error("Dropping %d activity log entries that could not be saved", len(failed))
+            return saved
+        with self._lock:
+            self._entries[:0] = failed
+            overflow = len(self._entries) - self.max_pending
+            if overflow > 0:
+                del self._entries[:overflow]
+        if overflow > 0:
+            logger.error("Activity log queue full; dropped %d oldest entries", overflow)
+        return 0
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(
+                target=self._run, name="activity-log-flusher", daemon=True,
+            )
+            self._flusher.start()
+
+    def _run(self) -> None:
+        while not self._wakeup.wait(self.interval):
+            try:
+                self.flush()
+            finally:
+                # This thread owns its own connection; don't keep it open idle.
+                connection.close()
+
+
+activity_buffer = ActivityLogBuffer()
+# Flush what is left when the worker shuts down.
+atexit.register(activity_buffer.flush)
@@ -1,13 +1,25 @@
-from datetime import date
-
 from rest_framework import mixins, viewsets
+from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
 
 from config.permissions import IsStaffUser
+from .dates import day_range_lookups, parse_date
+from .export import ExportMixin
 from .models import ActivityLog
 from .admin_serializers import AdminActivityLogSerializer
 
 
+class ActivityLogCursorPagination(CursorPagination):
+    """Keyset pagination: no COUNT(*) and constant cost at any depth."""
+
+    ordering = ("-created_at", "-id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
 class AdminActivityLogViewSet(
+    ExportMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     viewsets.GenericViewSet,
@@ -15,6 +27,17 @@ class AdminActivityLogViewSet(
     permission_classes = [IsStaffUser]
     serializer_class = AdminActivityLogSerializer
     queryset = ActivityLog.objects.select_related("actor").all()
+    export_filename = "activity"
+    export_fields = {
+        "id": "id",
+        "created_at": "created_at",
+        "actor": "actor__username",
+        "action": "action",
+        "entity_type": "entity_type",
+        "entity_id": "entity_id",
+        "summary": "summary",
+        "metadata": "metadata",
+    }
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -32,25 +55,48 @@ class AdminActivityLogViewSet(
         if actor:
             qs = qs.filter(actor_id=actor)
 
+        entity_id = (params.get("entity_id") or "").strip()
+        if entity_id:
+            qs = qs.filter(entity_id=entity_id)
+
         q = (params.get("q") or "").strip()
         if q:
+            # Served by the pg_trgm index on UPPER(summary) on PostgreSQL.
             qs = qs.filter(summary__icontains=q)
 
-        start_date = (params.get("start_date") or "").strip()
-        if start_date:
-            try:
-                start = date.fromisoformat(start_date)
-                qs = qs.filter(created_at__date__gte=start)
-            except ValueError:
-                pass
-
-        end_date = (params.get("end_date") or "").strip()
-        if end_date:
-            try:
-                end = date.fromisoformat(end_date)
-                qs = qs.filter(created_at__date__lte=end)
-            except ValueError:
-                pass
+        # Half-open created_at range in the configured time zone, so the
+        # created_at indexes are usable (unlike __date lookups).
+        qs = qs.filter(**day_range_lookups(
+            "created_at", parse_date(params.get("start_date")), parse_date(params.get("end_date")),
+        ))
 
         return qs
 
+    @property
+    def paginator(self):
+        """
+        Page-number pagination by default; ``?pagination=cursor`` switches
+        to keyset pagination, which stays fast on very large tables.
+        """
+        if not hasattr(self, "_paginator"):
+            use_cursor = (
+                self.action == "history"
+                or self.request.query_params.get("pagination") == "cursor"
+            )
+            self._paginator = ActivityLogCursorPagination() if use_cursor else super().paginator
+        return self._paginator
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path=r"history/(?P<entity_type>[^/.]+)/(?P<entity_id>[^/]+)",
+    )
+    def history(self, request, entity_type=None, entity_id=None):
+        """Keyset-paginated history of one entity, newest first."""
+        qs = ActivityLog.objects.select_related("actor").filter(
+            entity_type=entity_type, entity_id=entity_id,
+        )
+        page = self.paginate_queryset(qs)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
@@ -0,0 +1,269 @@
+"""
+Incrementally maintained dashboard counters.
+
+DashboardStatsView reads every total from DashboardCounter in one query
+instead of running a dozen COUNT/SUM queries per poll. The receivers in
+core.signals (and bulk code paths that bypass signals) report deltas via
+adjust(). Deltas are not written inside the caller's transaction, which
+would make every checkout lock the same few counter rows until it commits:
+they are queued in process on commit (rolled-back work counts nothing),
+summed, and applied with one F() update per key every
+DASHBOARD_COUNTERS_FLUSH_INTERVAL seconds by a background thread, so
+counters trail by at most that long. reconcile_counters() recomputes them
+from the source tables and is run periodically by the
+reconcile_dashboard_counters command (also after the first deploy, to
+create the rows) to correct any drift (e.g. deltas lost when a worker is
+killed).
+
+Revenue is stored in minor units (paisa) so every counter is an integer.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Sum
+
+from .models import DashboardCounter
+
+ORDER_STATUSES = ("pending", "confirmed", "cancelled")
+CANCELLED = "cancelled"
+
+COUNTER_KEYS = (
+    "orders.total", *(f"orders.{s}" for s in ORDER_STATUSES), "revenue",
+    "products.total", "products.active", "products.out_of_stock",
+    "categories", "subcategories", "brands", "contacts", "notifications",
+    "carts", "wishlist",
+)
+
+logger = logging.getLogger(__name__)
+
+_state = threading.local()
+
+
+@contextmanager
+def suspend_counters():
+    """Ignore counter adjustments in this thread, e.g. while archiving orders."""
+    previous = getattr(_state, "suspended", False)
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = previous
+
+
+def is_suspended() -> bool:
+    return getattr(_state, "suspended", False)
+
+
+def adjust(deltas: dict[str, int]) -> None:
+    """Queue counter deltas; they are applied after commit by the flusher."""
+    if is_suspended():
+        return
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    if not getattr(settings, "DASHBOARD_COUNTERS_BUFFERED", True):
+        transaction.on_commit(lambda: apply_deltas(deltas))
+        return
+    # Runs immediately outside atomic blocks, after commit inside them.
+    transaction.on_commit(lambda: counter_buffer.add(deltas))
+
+
+def apply_deltas(deltas: dict[str, int]) -> None:
+    """Write deltas with F() updates. Missing keys are left to reconciliation."""
+    with transaction.atomic():
+        for key in sorted(deltas):
+            if deltas[key]:
+                DashboardCounter.objects.filter(key=key).update(value=F("value") + deltas[key])
+
+
+class CounterBuffer:
+    """Thread-safe in-process sum of pending counter deltas."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: dict[str, int] = {}
+        self._flusher: threading.Thread | None = None
+
+    @property
+    def interval(self) -> float:
+        return float(getattr(settings, "DASHBOARD_COUNTERS_FLUSH_INTERVAL", 2.0))
+
+    def add(self, deltas: dict[str, int]) -> None:
+        with self._lock:
+            for key, delta in deltas.items():
+                self._pending[key] = self._pending.get(key, 0) + delta
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(
+                    target=self._run, name="dashboard-counter-flusher", daemon=True,
+                )
+                self._flusher.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not any(pending.values()):
+            return
+        try:
+            apply_deltas(pending)
+        except Exception:
+            logger.exception("Dashboard counter flush failed; retrying next interval")
+            self.add(pending)
+
+    def discard(self) -> None:
+        with self._lock:
+            self._pending = {}
+
+    def _run(self) -> None:
+        stop = threading.Event()
+        while not stop.wait(self.interval):
+            try:
+                self.flush()
+            finally:
+                connection.close()
+
+
+counter_buffer = CounterBuffer()
+atexit.register(counter_buffer.flush)
+
+
+def mark_cart(cart_id, has_items: bool) -> None:
+    """Set Cart.has_items and move the carts counter if it actually flipped."""
+    from cart.models import Cart
+
+    # The conditional update makes the flip idempotent under concurrency.
+    if Cart.objects.filter(pk=cart_id, has_items=not has_items).update(has_items=has_items):
+        adjust({"carts": 1 if has_items else -1})
+
+
+def to_minor(amount) -> int:
+    return int((Decimal(amount or 0) * 100).to_integral_value())
+
+
+def from_minor(value: int) -> Decimal:
+    return (Decimal(value) / 100).quantize(Decimal("0.01"))
+
+
+def order_deltas(before: tuple | None, after: tuple | None) -> dict[str, int]:
+    """
+    Counter deltas for an order going from before to after.
+
+    Each side is a (status, total) tuple, or None when the order does not
+    exist on that side (creation / deletion).
+    """
+    deltas: dict[str, int] = {}
+
+    def apply(state, sign):
+        if state is None:
+            return
+        status, total = state
+        deltas["orders.total"] = deltas.get("orders.total", 0) + sign
+        key = f"orders.{status}"
+        deltas[key] = deltas.get(key, 0) + sign
+        if status != CANCELLED:
+            deltas["revenue"] = deltas.get("revenue", 0) + sign * to_minor(total)
+
+    apply(before, -1)
+    apply(after, 1)
+    return deltas
+
+
+def product_deltas(before: tuple | None, after: tuple | None) -> dict[str, int]:
+    """Counter deltas for a product; each side is (is_active, stock) or None."""
+    deltas: dict[str, int] = {}
+
+    def apply(state, sign):
+        if state is None:
+            return
+        is_active, stock = state
+        deltas["products.total"] = deltas.get("products.total", 0) + sign
+        if is_active:
+            deltas["products.active"] = deltas.get("products.active", 0) + sign
+            if stock == 0:
+                deltas["products.out_of_stock"] = deltas.get("products.out_of_stock", 0) + sign
+
+    apply(before, -1)
+    apply(after, 1)
+    return deltas
+
+
+def compute_counters() -> dict[str, int]:
+    """Recompute every counter from the source tables (archived orders included)."""
+    from cart.models import Cart, CartItem
+    from contact.models import ContactSubmission
+    from notifications.models import Notification
+    from orders.models import ArchivedOrder, Order
+    from products.models import Brand, Category, NavbarCategory, Product
+    from wishlist.models import WishlistItem
+
+    values: dict[str, int] = {"orders.total": 0, "revenue": 0}
+    values.update({f"orders.{s}": 0 for s in ORDER_STATUSES})
+    for model in (Order, ArchivedOrder):
+        for row in model.objects.order_by().values("status").annotate(
+            count=Count("pk"), revenue=Sum("total"),
+        ):
+            values["orders.total"] += row["count"]
+            key = f"orders.{row['status']}"
+            values[key] = values.get(key, 0) + row["count"]
+            if row["status"] != CANCELLED:
+                values["revenue"] += to_minor(row["revenue"])
+
+    product_stats = Product.objects.aggregate(
+        total=Count("id"),
+        active=Count("id", filter=Q(is_active=True)),
+        oos=Count("id", filter=Q(stock=0, is_active=True)),
+    )
+    values["products.total"] = product_stats["total"]
+    values["products.active"] = product_stats["active"]
+    values["products.out_of_stock"] = product_stats["oos"]
+
+    values["categories"] = NavbarCategory.objects.count()
+    values["subcategories"] = Category.objects.count()
+    values["brands"] = Brand.objects.count()
+    values["contacts"] = ContactSubmission.objects.count()
+    values["notifications"] = Notification.objects.filter(is_active=True).count()
+    values["wishlist"] = WishlistItem.objects.count()
+
+    # Re-sync the per-cart flag the incremental cart counter relies on,
+    # touching only the carts whose flag is actually wrong.
+    has_lines = Exists(CartItem.objects.filter(cart=OuterRef("pk")))
+    Cart.objects.filter(has_items=True).exclude(has_lines).update(has_items=False)
+    Cart.objects.filter(has_lines, has_items=False).update(has_items=True)
+    values["carts"] = Cart.objects.filter(has_items=True).count()
+    return values
+
+
+def reconcile_counters() -> dict[str, int]:
+    """Overwrite the stored counters with freshly computed values."""
+    # Deltas still queued here describe writes the recount already sees.
+    counter_buffer.discard()
+    values = compute_counters()
+    DashboardCounter.objects.bulk_create(
+        [DashboardCounter(key=k, value=v) for k, v in values.items()],
+        update_conflicts=True,
+        unique_fields=["key"],
+        update_fields=["value"],
+    )
+    return values
+
+
+def read_counters() -> dict[str, int]:
+    """
+    All counters in one query. Missing counters read as 0: recounting is
+    left to the reconcile_dashboard_counters command, never a request.
+    """
+    values = dict(DashboardCounter.objects.values_list("key", "value"))
+    missing = set(COUNTER_KEYS) - values.keys()
+    if missing:
+        logger.warning(
+            "Dashboard counters %s missing; run reconcile_dashboard_counters",
+            ", ".join(sorted(missing)),
+        )
+        values.update(dict.fromkeys(missing, 0))
+    return values
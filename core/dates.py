@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+
+from django.utils import timezone
+
+
+def parse_date(value: str | None) -> date | None:
+    """Parse an ISO date query parameter, returning None when absent or invalid."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def local_day_start(day: date) -> datetime:
+    """Aware datetime for midnight of day in the current time zone."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def day_range_lookups(
+    field: str, start: date | None, end: date | None
+) -> dict[str, datetime]:
+    """
+    Filter kwargs selecting whole local days start..end (inclusive).
+
+    Uses a half-open range on the raw column (>= start midnight, < midnight
+    after end) instead of ``__date`` lookups, so an index on field is usable.
+    """
+    lookups: dict[str, datetime] = {}
+    if start:
+        lookups[f"{field}__gte"] = local_day_start(start)
+    if end:
+        lookups[f"{field}__lt"] = local_day_start(end + timedelta(days=1))
+    return lookups
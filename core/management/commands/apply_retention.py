@@ -0,0 +1,44 @@
+"""
+Delete expired rows according to the retention policies in core.retention.
+Usage: python manage.py apply_retention [--only carts,sessions] [--batch-size 1000] [--pause 0] [--dry-run]
+
+Run daily. Policies: carts (anonymous, inactive), wishlist (session-keyed),
+sessions (expired), contacts, activity. Retention periods come from the
+RETENTION_DAYS setting.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.retention import POLICIES, purge, retention_days
+
+
+class Command(BaseCommand):
+    help = "Purge expired rows from unbounded tables in small batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', default='', help="Comma-separated policy names")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between batches")
+        parser.add_argument('--dry-run', action='store_true', help="Count rows without deleting")
+
+    def handle(self, *args, **options):
+        names = [n.strip() for n in options['only'].split(',') if n.strip()] or list(POLICIES)
+        unknown = [n for n in names if n not in POLICIES]
+        if unknown:
+            raise CommandError(f"Unknown policies: {', '.join(unknown)}. Available: {', '.join(POLICIES)}.")
+
+        total = 0
+        for name in names:
+            policy = POLICIES[name]
+            result = purge(
+                policy,
+                batch_size=max(1, options['batch_size']),
+                pause=options['pause'],
+                dry_run=options['dry_run'],
+            )
+            total += result.deleted
+            verb = "would delete" if options['dry_run'] else "deleted"
+            self.stdout.write(
+                f"{name} (> {retention_days(name)} days): {verb} {result.deleted} rows "
+                f"in {result.batches} batches, {result.seconds:.1f}s"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Done: {total} rows."))
@@ -0,0 +1,47 @@
+"""
+Roll closed days up into DailyMetric for the dashboard analytics.
+Usage: python manage.py rollup_daily_metrics [--recompute-days 7] [--since YYYY-MM-DD]
+
+Run daily after midnight (TIME_ZONE). Each run rolls up the days since the
+last run and re-rolls the trailing --recompute-days, so late status changes
+(e.g. cancellations) are reflected in revenue and units. --since rebuilds
+everything from the given day.
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.dates import parse_date
+from core.rollups import first_activity_day, rolled_up_through, rollup_days
+
+
+class Command(BaseCommand):
+    help = "Maintain the DailyMetric rollups for closed days"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recompute-days', type=int, default=7)
+        parser.add_argument('--since', default=None, help="Rebuild from this date (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        end = timezone.localdate() - timedelta(days=1)
+
+        if options['since']:
+            start = parse_date(options['since'])
+            if start is None:
+                raise CommandError("--since must be a date in YYYY-MM-DD format.")
+        else:
+            through = rolled_up_through()
+            if through is None:
+                start = first_activity_day()
+                if start is None:
+                    self.stdout.write("Nothing to roll up.")
+                    return
+            else:
+                start = through + timedelta(days=1) - timedelta(days=max(0, options['recompute_days']))
+
+        if start > end:
+            self.stdout.write("Rollups are up to date.")
+            return
+        days = rollup_days(start, end)
+        self.stdout.write(self.style.SUCCESS(f"Rolled up {days} days ({start} to {end})."))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_dashboardcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('metric', models.CharField(choices=[('orders', 'Orders'), ('units', 'Units sold'), ('products', 'Products added'), ('cart_items', 'Cart items added'), ('wishlist_items', 'Wishlist items added'), ('contacts', 'Contact submissions')], max_length=30)),
+                ('count', models.BigIntegerField(default=0)),
+                ('amount', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['date', 'metric'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'metric'), name='core_dailymetric_date_metric')],
+            },
+        ),
+    ]
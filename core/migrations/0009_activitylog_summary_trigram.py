@@ -0,0 +1,34 @@
+from django.db import migrations
+
+INDEX_NAME = 'core_activitylog_summary_trgm'
+
+
+def create_trigram_index(apps, schema_editor):
+    # summary__icontains compiles to UPPER(summary) LIKE UPPER('%q%') on
+    # PostgreSQL; a pg_trgm GIN index on the same expression serves it.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} '
+        'ON core_activitylog USING gin (UPPER(summary) gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('core', '0008_activitylog_entity_history_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
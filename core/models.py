@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class DashboardBranding(models.Model):
@@ -18,6 +19,47 @@ class DashboardBranding(models.Model):
         return self.admin_name or "Dashboard branding"
 
 
+class DashboardCounter(models.Model):
+    """Incrementally maintained dashboard total; see core.counters."""
+
+    key = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.key}={self.value}"
+
+
+class DailyMetric(models.Model):
+    """
+    Per-day rollup of a dashboard metric, maintained by the
+    rollup_daily_metrics command for closed days; see core.rollups.
+    """
+
+    class Metric(models.TextChoices):
+        ORDERS = "orders", "Orders"
+        UNITS = "units", "Units sold"
+        PRODUCTS = "products", "Products added"
+        CART_ITEMS = "cart_items", "Cart items added"
+        WISHLIST_ITEMS = "wishlist_items", "Wishlist items added"
+        CONTACTS = "contacts", "Contact submissions"
+
+    date = models.DateField()
+    metric = models.CharField(max_length=30, choices=Metric.choices)
+    count = models.BigIntegerField(default=0)
+    # Sum in minor units (orders: revenue excluding cancelled orders)
+    amount = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["date", "metric"]
+        constraints = [
+            models.UniqueConstraint(fields=["date", "metric"], name="core_dailymetric_date_metric"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.date} {self.metric}={self.count}"
+
+
 class ActivityLog(models.Model):
     class Action(models.TextChoices):
         CREATE = "create", "Create"
@@ -37,13 +79,16 @@ class ActivityLog(models.Model):
     entity_id = models.CharField(max_length=64, blank=True, default="")
     summary = models.CharField(max_length=255)
     metadata = models.JSONField(blank=True, default=dict)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the entry is logged, not when the buffered write happens.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["-created_at"]),
             models.Index(fields=["entity_type", "action", "-created_at"]),
+            # Per-entity history; see AdminActivityLogViewSet.history
+            models.Index(fields=["entity_type", "entity_id", "-created_at"]),
         ]
 
     def __str__(self) -> str:
@@ -0,0 +1,146 @@
+"""
+Retention policies for tables that otherwise grow without bound.
+
+Each policy selects expired rows; purge() deletes them in primary-key
+keyset batches (each batch its own short transaction), so no statement
+scans or locks more than batch_size rows. Dashboard counters affected by
+a purge are adjusted once per batch rather than per row.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from . import counters
+
+DEFAULT_RETENTION_DAYS = {
+    "carts": 30,
+    "wishlist": 90,
+    "sessions": 0,
+    "contacts": 365,
+    "activity": 365,
+}
+
+
+def retention_days(name: str) -> int:
+    configured = getattr(settings, "RETENTION_DAYS", {}) or {}
+    return int(configured.get(name, DEFAULT_RETENTION_DAYS[name]))
+
+
+def _cutoff(name: str):
+    return timezone.now() - timedelta(days=retention_days(name))
+
+
+def _anonymous_carts():
+    from cart.models import Cart, CartItem
+
+    cutoff = _cutoff("carts")
+    recent_items = CartItem.objects.filter(cart=OuterRef("pk"), updated_at__gte=cutoff)
+    return Cart.objects.filter(user__isnull=True, updated_at__lt=cutoff).exclude(Exists(recent_items))
+
+
+def _cart_counters(qs) -> dict[str, int]:
+    return {"carts": -qs.filter(has_items=True).count()}
+
+
+def _anonymous_wishlist():
+    from wishlist.models import WishlistItem
+
+    return WishlistItem.objects.filter(user__isnull=True, created_at__lt=_cutoff("wishlist"))
+
+
+def _expired_sessions():
+    from django.contrib.sessions.models import Session
+
+    return Session.objects.filter(expire_date__lt=_cutoff("sessions"))
+
+
+def _contacts():
+    from contact.models import ContactSubmission
+
+    return ContactSubmission.objects.filter(created_at__lt=_cutoff("contacts"))
+
+
+def _activity():
+    from .models import ActivityLog
+
+    return ActivityLog.objects.filter(created_at__lt=_cutoff("activity"))
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    name: str
+    description: str
+    queryset: Callable
+    # Counter deltas for a batch about to be deleted (queryset of the batch)
+    counter_deltas: Callable | None = None
+
+
+POLICIES = {
+    policy.name: policy for policy in (
+        RetentionPolicy(
+            "carts", "Anonymous carts with no activity (items cascade)",
+            _anonymous_carts, _cart_counters,
+        ),
+        RetentionPolicy(
+            "wishlist", "Session-keyed wishlist items",
+            _anonymous_wishlist, lambda qs: {"wishlist": -qs.count()},
+        ),
+        RetentionPolicy("sessions", "Expired django_session rows", _expired_sessions),
+        RetentionPolicy(
+            "contacts", "Contact submissions",
+            _contacts, lambda qs: {"contacts": -qs.count()},
+        ),
+        RetentionPolicy("activity", "Admin activity log entries", _activity),
+    )
+}
+
+
+@dataclass
+class PurgeResult:
+    policy: str
+    deleted: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+
+def purge(policy: RetentionPolicy, batch_size: int = 1000, pause: float = 0.0,
+          dry_run: bool = False) -> PurgeResult:
+    """Delete the rows selected by policy in primary-key ordered batches."""
+    result = PurgeResult(policy.name)
+    started = time.monotonic()
+    qs = policy.queryset()
+    model = qs.model
+    last_pk = None
+    while True:
+        page = qs.order_by("pk")
+        if last_pk is not None:
+            page = page.filter(pk__gt=last_pk)
+        pks = list(page.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            break
+        last_pk = pks[-1]
+        result.batches += 1
+        if dry_run:
+            result.deleted += len(pks)
+            continue
+        with transaction.atomic():
+            # Bounded by the pk range and re-checked against the policy,
+            # so rows revived since the page was read are kept.
+            batch = qs.filter(pk__gte=pks[0], pk__lte=last_pk, pk__in=pks)
+            deltas = policy.counter_deltas(batch) if policy.counter_deltas else {}
+            with counters.suspend_counters():
+                _, per_model = batch.delete()
+            counters.adjust(deltas)
+        result.deleted += per_model.get(model._meta.label, 0)
+        if pause:
+            time.sleep(pause)
+    result.seconds = time.monotonic() - started
+    return result
@@ -0,0 +1,142 @@
+"""
+Daily rollups behind DashboardAnalyticsView.
+
+Closed days (before today, in TIME_ZONE) are read from DailyMetric rows
+written by the rollup_daily_metrics command; days the command has not
+covered yet, including today, are computed live with a half-open
+``created_at`` range so the indexes on created_at are used. Week and month
+buckets are summed from the daily values, so any range costs O(days)
+instead of scanning history.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .counters import to_minor
+from .dates import day_range_lookups
+from .models import DailyMetric
+
+Metric = DailyMetric.Metric
+
+
+def _sources():
+    """(metric, queryset, count expression, amount expression, date field) per source."""
+    from cart.models import CartItem
+    from contact.models import ContactSubmission
+    from orders.models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+    from products.models import Product
+    from wishlist.models import WishlistItem
+
+    sold = ~Q(status=Order.Status.CANCELLED)
+    item_sold = ~Q(order__status=Order.Status.CANCELLED)
+    return [
+        (Metric.ORDERS, Order.objects.all(), Count("pk"), Sum("total", filter=sold), "created_at"),
+        (Metric.ORDERS, ArchivedOrder.objects.all(), Count("pk"), Sum("total", filter=sold), "created_at"),
+        (Metric.UNITS, OrderItem.objects.filter(item_sold), Sum("quantity"), None, "order__created_at"),
+        (Metric.UNITS, ArchivedOrderItem.objects.filter(item_sold), Sum("quantity"), None, "order__created_at"),
+        (Metric.PRODUCTS, Product.objects.all(), Count("pk"), None, "created_at"),
+        (Metric.CART_ITEMS, CartItem.objects.all(), Count("pk"), None, "created_at"),
+        (Metric.WISHLIST_ITEMS, WishlistItem.objects.all(), Count("pk"), None, "created_at"),
+        (Metric.CONTACTS, ContactSubmission.objects.all(), Count("pk"), None, "created_at"),
+    ]
+
+
+def compute_daily(start: date, end: date) -> dict[tuple[date, str], list[int]]:
+    """Live {(day, metric): [count, amount]} for local days start..end (inclusive)."""
+    values: dict[tuple[date, str], list[int]] = defaultdict(lambda: [0, 0])
+    for metric, qs, count_expr, amount_expr, field in _sources():
+        aggregates = {"n": count_expr}
+        if amount_expr is not None:
+            aggregates["amount"] = amount_expr
+        rows = (
+            qs.filter(**day_range_lookups(field, start, end))
+            .annotate(day=TruncDate(field))
+            .values("day")
+            .annotate(**aggregates)
+            .order_by()
+        )
+        for row in rows:
+            entry = values[(row["day"], metric)]
+            entry[0] += row["n"] or 0
+            entry[1] += to_minor(row.get("amount"))
+    return values
+
+
+def first_activity_day() -> date | None:
+    """Earliest local day with any source row, or None for an empty database."""
+    firsts = []
+    for _metric, qs, _count, _amount, field in _sources():
+        first = qs.aggregate(first=Min(field))["first"]
+        if first is not None:
+            firsts.append(timezone.localdate(first))
+    return min(firsts, default=None)
+
+
+def rolled_up_through() -> date | None:
+    """Last day covered by DailyMetric rows, if any."""
+    return DailyMetric.objects.aggregate(last=Max("date"))["last"]
+
+
+def rollup_days(start: date, end: date) -> int:
+    """(Re)write DailyMetric rows for days start..end; returns the number of days."""
+    values = compute_daily(start, end)
+    rows = []
+    day = start
+    while day <= end:
+        for metric in Metric.values:
+            count, amount = values.get((day, metric), (0, 0))
+            # Zero rows are stored too, so rolled_up_through() marks coverage.
+            rows.append(DailyMetric(date=day, metric=metric, count=count, amount=amount))
+        day += timedelta(days=1)
+    with transaction.atomic():
+        DailyMetric.objects.bulk_create(
+            rows,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=["date", "metric"],
+            update_fields=["count", "amount", "updated_at"],
+        )
+    return (end - start).days + 1
+
+
+def daily_values(start: date, end: date) -> dict[tuple[date, str], list[int]]:
+    """{(day, metric): [count, amount]} from rollups for closed days, live otherwise."""
+    values: dict[tuple[date, str], list[int]] = defaultdict(lambda: [0, 0])
+    through = rolled_up_through()
+    last_closed = timezone.localdate() - timedelta(days=1)
+    if through is not None:
+        through = min(through, last_closed)
+    if through is not None and through >= start:
+        for row in DailyMetric.objects.filter(date__gte=start, date__lte=min(end, through)).values(
+            "date", "metric", "count", "amount",
+        ):
+            values[(row["date"], row["metric"])] = [row["count"], row["amount"]]
+    live_start = start if through is None else max(start, through + timedelta(days=1))
+    if live_start <= end:
+        values.update(compute_daily(live_start, end))
+    return values
+
+
+def bucket_start(day: date, bucket: str) -> date:
+    """Start of the week (Monday) or month containing day; the day itself otherwise."""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def bucketed(values: dict[tuple[date, str], list[int]], bucket: str) -> dict[date, dict[str, list[int]]]:
+    """Fold daily values into {bucket start: {metric: [count, amount]}}."""
+    buckets: dict[date, dict[str, list[int]]] = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+    for (day, metric), (count, amount) in values.items():
+        entry = buckets[bucket_start(day, bucket)][metric]
+        entry[0] += count
+        entry[1] += amount
+    return buckets
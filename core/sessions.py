@@ -0,0 +1,169 @@
+"""
+Session engine: process-local LRU -> shared cache -> database.
+
+Extends Django's cached_db store so hot sessions are served from a small
+in-process LRU (entries live SESSION_LOCAL_CACHE_TTL seconds, bounding
+staleness between workers) before falling back to the shared cache and
+finally the django_session table.
+
+Every write and delete stores a fresh version token for the session in
+the shared cache. A local entry is re-checked against its token (one small
+cache GET instead of the full session payload) when it was last checked
+more than SESSION_VERSION_CHECK_INTERVAL seconds ago, so hits within that
+interval cost no round trip and a logout or change in one worker is seen
+by the others at most that long afterwards. Set it to 0 to check on every
+hit; writes and deletes in the same worker take effect immediately.
+
+Writes are coalesced: save() is skipped when the session data is unchanged
+since it was loaded and this process wrote it less than
+SESSION_REFRESH_INTERVAL seconds ago, so flag-only "modifications" and
+SESSION_SAVE_EVERY_REQUEST expiry refreshes stop hitting the database on
+every request.
+
+Enable with SESSION_ENGINE = "core.sessions" and a shared CACHES backend.
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+
+class LocalLRU:
+    """
+    Small thread-safe LRU of
+    {key: (data, fingerprint, written_at, expires_at, version, checked_at)}.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+
+    @property
+    def max_entries(self) -> int:
+        return int(getattr(settings, "SESSION_LOCAL_CACHE_SIZE", 10000))
+
+    @property
+    def ttl(self) -> float:
+        return float(getattr(settings, "SESSION_LOCAL_CACHE_TTL", 5))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[3] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, data, fingerprint, written_at=None, version=None):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if written_at is None and previous is not None and previous[1] == fingerprint:
+                written_at = previous[2]
+            now = time.monotonic()
+            self._entries[key] = (data, fingerprint, written_at, now + self.ttl, version, now)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def mark_checked(self, key):
+        """Record that the entry's version token was just confirmed."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = entry[:5] + (time.monotonic(),)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_sessions = LocalLRU()
+
+
+def fingerprint(data: dict) -> bytes:
+    raw = json.dumps(data, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = "core.sessions"
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._loaded_fingerprint = None
+
+    def _version_key(self, session_key):
+        return f"{self.cache_key_prefix}.v:{session_key}"
+
+    def _current_version(self):
+        return self._cache.get(self._version_key(self.session_key))
+
+    def _bump_version(self, session_key):
+        version = uuid.uuid4().hex
+        self._cache.set(self._version_key(session_key), version, self.get_expiry_age())
+        return version
+
+    def load(self):
+        key = self.cache_key_prefix + self.session_key if self.session_key else None
+        entry = local_sessions.get(key) if key else None
+        check_every = float(getattr(settings, "SESSION_VERSION_CHECK_INTERVAL", 1))
+        if entry is not None and time.monotonic() - entry[5] >= check_every:
+            if entry[4] is None or entry[4] != self._current_version():
+                # Changed or deleted by another worker since we cached it.
+                local_sessions.delete(key)
+                entry = None
+            else:
+                local_sessions.mark_checked(key)
+        if entry is not None:
+            data = copy.deepcopy(entry[0])
+        else:
+            data = super().load()
+            if self.session_key and data:
+                version = self._current_version() or self._bump_version(self.session_key)
+                local_sessions.set(key, copy.deepcopy(data), fingerprint(data), version=version)
+        self._loaded_fingerprint = fingerprint(data)
+        return data
+
+    def _recently_written(self, key, current) -> bool:
+        entry = local_sessions.get(key)
+        if entry is None or entry[1] != current or entry[2] is None:
+            return False
+        interval = float(getattr(settings, "SESSION_REFRESH_INTERVAL", 300))
+        return time.monotonic() - entry[2] < interval
+
+    def save(self, must_create=False):
+        data = self._get_session(no_load=must_create)
+        current = fingerprint(data)
+        if not must_create and self.session_key:
+            key = self.cache_key_prefix + self.session_key
+            if current == self._loaded_fingerprint and self._recently_written(key, current):
+                return
+        super().save(must_create)
+        version = self._bump_version(self.session_key)
+        local_sessions.set(
+            self.cache_key, copy.deepcopy(data), current,
+            written_at=time.monotonic(), version=version,
+        )
+        self._loaded_fingerprint = current
+
+    def delete(self, session_key=None):
+        session_key = session_key or self.session_key
+        if session_key:
+            local_sessions.delete(self.cache_key_prefix + session_key)
+            # Invalidates the local copies held by other workers (covers flush() and cycle_key()).
+            self._bump_version(session_key)
+        super().delete(session_key)
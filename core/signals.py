@@ -0,0 +1,175 @@
+"""
+Signal receivers that keep core.counters.DashboardCounter in step.
+
+The state a counter depends on is stashed on the instance at load time
+(post_init) so post_save can compute a delta without re-reading the row.
+Code that writes with queryset.update() / bulk_update() bypasses these
+receivers and must call core.counters.adjust() itself, or rely on the
+periodic reconciliation.
+"""
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+
+from cart.models import CartItem
+from contact.models import ContactSubmission
+from notifications.models import Notification
+from orders.models import Order
+from products.models import Brand, Category, NavbarCategory, Product
+from wishlist.models import WishlistItem
+
+from . import counters
+
+_SNAPSHOT = "_counter_snapshot"
+
+
+def _stash(fields):
+    def receiver(sender, instance, **kwargs):
+        if all(f in instance.__dict__ for f in fields):
+            setattr(instance, _SNAPSHOT, tuple(instance.__dict__[f] for f in fields))
+        else:
+            setattr(instance, _SNAPSHOT, None)
+    return receiver
+
+
+def _current(instance, fields):
+    return tuple(getattr(instance, f) for f in fields)
+
+
+def _stash_stored(fields):
+    """pre_delete: record the row as stored, since the instance may be stale."""
+    def receiver(sender, instance, **kwargs):
+        if counters.is_suspended():
+            return
+        stored = sender.objects.filter(pk=instance.pk).values_list(*fields).first()
+        setattr(instance, _SNAPSHOT, stored)
+    return receiver
+
+
+# Orders ---------------------------------------------------------------------
+
+_ORDER_FIELDS = ("status", "total")
+_stash_order = _stash(_ORDER_FIELDS)
+_stash_stored_order = _stash_stored(_ORDER_FIELDS)
+
+
+def _order_saved(sender, instance, created, update_fields=None, **kwargs):
+    after = _current(instance, _ORDER_FIELDS)
+    if created:
+        before = None
+    else:
+        before = getattr(instance, _SNAPSHOT, None)
+        if before is None:
+            # Partially loaded instance: we cannot tell what changed.
+            setattr(instance, _SNAPSHOT, after)
+            return
+    counters.adjust(counters.order_deltas(before, after))
+    setattr(instance, _SNAPSHOT, after)
+
+
+def _order_deleted(sender, instance, **kwargs):
+    before = getattr(instance, _SNAPSHOT, None) or _current(instance, _ORDER_FIELDS)
+    counters.adjust(counters.order_deltas(before, None))
+
+
+# Products -------------------------------------------------------------------
+
+_PRODUCT_FIELDS = ("is_active", "stock")
+_stash_product = _stash(_PRODUCT_FIELDS)
+_stash_stored_product = _stash_stored(_PRODUCT_FIELDS)
+
+
+def _product_saved(sender, instance, created, **kwargs):
+    after = _current(instance, _PRODUCT_FIELDS)
+    before = None if created else getattr(instance, _SNAPSHOT, None)
+    if not created and before is None:
+        setattr(instance, _SNAPSHOT, after)
+        return
+    counters.adjust(counters.product_deltas(before, after))
+    setattr(instance, _SNAPSHOT, after)
+
+
+def _product_deleted(sender, instance, **kwargs):
+    before = getattr(instance, _SNAPSHOT, None) or _current(instance, _PRODUCT_FIELDS)
+    counters.adjust(counters.product_deltas(before, None))
+
+
+# Notifications (only active ones are counted) -------------------------------
+
+_stash_notification = _stash(("is_active",))
+
+
+def _notification_saved(sender, instance, created, **kwargs):
+    before = None if created else getattr(instance, _SNAPSHOT, None)
+    if not created and before is None:
+        setattr(instance, _SNAPSHOT, (instance.is_active,))
+        return
+    was_active = bool(before and before[0])
+    delta = int(instance.is_active) - int(was_active)
+    counters.adjust({"notifications": delta})
+    setattr(instance, _SNAPSHOT, (instance.is_active,))
+
+
+def _notification_deleted(sender, instance, **kwargs):
+    if instance.is_active:
+        counters.adjust({"notifications": -1})
+
+
+# Plain row counts -----------------------------------------------------------
+
+def _row_counter(key):
+    def saved(sender, instance, created, **kwargs):
+        if created:
+            counters.adjust({key: 1})
+
+    def deleted(sender, instance, **kwargs):
+        counters.adjust({key: -1})
+
+    return saved, deleted
+
+
+_ROW_COUNTERS = {
+    NavbarCategory: "categories",
+    Category: "subcategories",
+    Brand: "brands",
+    ContactSubmission: "contacts",
+    WishlistItem: "wishlist",
+}
+
+
+# Carts (counted only while they hold at least one item) ---------------------
+# Bulk writers (cart sync, retention) call counters.mark_cart themselves.
+
+def _cart_item_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.mark_cart(instance.cart_id, True)
+
+
+def _cart_item_deleted(sender, instance, **kwargs):
+    if counters.is_suspended():
+        # Bulk purges account for the cart counter per batch.
+        return
+    if not CartItem.objects.filter(cart_id=instance.cart_id).exists():
+        counters.mark_cart(instance.cart_id, False)
+
+
+def connect():
+    post_init.connect(_stash_order, sender=Order, dispatch_uid="counters_order_init")
+    post_save.connect(_order_saved, sender=Order, dispatch_uid="counters_order_save")
+    pre_delete.connect(_stash_stored_order, sender=Order, dispatch_uid="counters_order_pre_delete")
+    post_delete.connect(_order_deleted, sender=Order, dispatch_uid="counters_order_delete")
+
+    post_init.connect(_stash_product, sender=Product, dispatch_uid="counters_product_init")
+    post_save.connect(_product_saved, sender=Product, dispatch_uid="counters_product_save")
+    pre_delete.connect(_stash_stored_product, sender=Product, dispatch_uid="counters_product_pre_delete")
+    post_delete.connect(_product_deleted, sender=Product, dispatch_uid="counters_product_delete")
+
+    post_init.connect(_stash_notification, sender=Notification, dispatch_uid="counters_notification_init")
+    post_save.connect(_notification_saved, sender=Notification, dispatch_uid="counters_notification_save")
+    post_delete.connect(_notification_deleted, sender=Notification, dispatch_uid="counters_notification_delete")
+
+    for model, key in _ROW_COUNTERS.items():
+        saved, deleted = _row_counter(key)
+        post_save.connect(saved, sender=model, weak=False, dispatch_uid=f"counters_{key}_save")
+        post_delete.connect(deleted, sender=model, weak=False, dispatch_uid=f"counters_{key}_delete")
+
+    post_save.connect(_cart_item_saved, sender=CartItem, dispatch_uid="counters_cartitem_save")
+    post_delete.connect(_cart_item_deleted, sender=CartItem, dispatch_uid="counters_cartitem_delete")
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import MetaEventOutbox
+
+
+@admin.register(MetaEventOutbox)
+class MetaEventOutboxAdmin(admin.ModelAdmin):
+    list_display = ('event_name', 'status', 'attempts', 'created_at', 'available_at', 'sent_at')
+    list_filter = ('status', 'event_name')
+    readonly_fields = ('event_name', 'priority', 'payload', 'created_at', 'sent_at', 'last_error')
@@ -1,6 +1,21 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 
 class MetaPixelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'meta_pixel'
+
+    def ready(self):
+        from .client import is_configured
+
+        if is_configured() and getattr(settings, 'META_EVENT_DELIVERY', 'dispatcher') == 'outbox':
+            # Nothing is sent unless the worker runs; the outbox just grows.
+            logger.warning(
+                'META_EVENT_DELIVERY is "outbox": events are only sent while '
+                '`python manage.py meta_dispatch` is running'
+            )
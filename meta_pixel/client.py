@@ -0,0 +1,138 @@
+"""
+HTTP side of the Meta Conversions API: a pooled Graph API client and a
+circuit breaker shared by everything that delivers events.
+"""
+import logging
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Graph API limit on events per request
+MAX_BATCH_SIZE = 1000
+
+SENT = 'sent'
+RETRY = 'retry'
+REJECTED = 'rejected'
+
+
+def get_meta_settings():
+    return {
+        'pixel_id': getattr(settings, 'META_PIXEL_ID', ''),
+        'access_token': getattr(settings, 'META_ACCESS_TOKEN', ''),
+        'api_version': getattr(settings, 'META_API_VERSION', 'v25.0'),
+        'test_event_code': getattr(settings, 'META_TEST_EVENT_CODE', ''),
+        'base_url': getattr(settings, 'META_API_BASE_URL', 'https://graph.facebook.com'),
+    }
+
+
+def is_configured() -> bool:
+    cfg = get_meta_settings()
+    return bool(cfg['pixel_id'] and cfg['access_token'])
+
+
+class GraphClient:
+    """Posts batches of events over a keep-alive connection pool."""
+
+    def __init__(self, pool_size: int = 4, timeout: float | None = None):
+        self.timeout = timeout or getattr(settings, 'META_DISPATCH_TIMEOUT', 5)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def send(self, events: list[dict]) -> tuple[str, float]:
+        """
+        POST events in one request's data array.
+
+        Returns (outcome, seconds taken). Timeouts, connection errors, 429
+        and 5xx are RETRY; other 4xx reject the whole batch, as the Graph
+        API does.
+        """
+        cfg = get_meta_settings()
+        url = '{}/{}/{}/events'.format(
+            cfg['base_url'].rstrip('/'), cfg['api_version'], cfg['pixel_id'],
+        )
+        payload: dict = {'data': events}
+        if cfg['test_event_code']:
+            payload['test_event_code'] = cfg['test_event_code']
+
+        started = time.monotonic()
+        try:
+            resp = self.session.post(
+                url, params={'access_token': cfg['access_token']}, json=payload, timeout=self.timeout,
+            )
+        except requests.RequestException as exc:
+            logger.warning('Meta Conversions API request failed (%d events): %s', len(events), exc)
+            return RETRY, time.monotonic() - started
+        elapsed = time.monotonic() - started
+
+        if resp.ok:
+            logger.debug('Meta Conversions API accepted %d events', len(events))
+            return SENT, elapsed
+        logger.warning(
+            'Meta Conversions API error for %d events: %s %s',
+            len(events), resp.status_code, resp.text[:500],
+        )
+        if resp.status_code == 429 or resp.status_code >= 500:
+            return RETRY, elapsed
+        return REJECTED, elapsed
+
+
+class CircuitBreaker:
+    """
+    Exponential backoff after failed or slow calls; after `threshold`
+    consecutive failures the circuit opens for `reset_timeout` seconds and
+    then lets a single trial call through (half-open).
+    """
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30.0,
+                 backoff_base: float = 0.5, backoff_max: float = 30.0):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failures = 0
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.failures >= self.threshold
+
+    def delay(self) -> float:
+        """Seconds until the next call may go out."""
+        return max(0.0, self._blocked_until - time.monotonic())
+
+    def acquire(self) -> float:
+        """
+        Return 0 and reserve the call if one may go out now, else the delay.
+        In the half-open state only the first caller gets through.
+        """
+        with self._lock:
+            wait = self.delay()
+            if wait == 0 and self.is_open:
+                self._blocked_until = time.monotonic() + self.reset_timeout
+            return wait
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._blocked_until = 0.0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.is_open:
+                pause = self.reset_timeout
+                if self.failures == self.threshold:
+                    logger.warning('Meta Conversions API circuit open for %.0fs', pause)
+            else:
+                pause = min(self.backoff_max, self.backoff_base * 2 ** (self.failures - 1))
+                pause *= random.uniform(0.8, 1.2)
+            self._blocked_until = time.monotonic() + pause
@@ -0,0 +1,202 @@
+"""
+In-process dispatcher for Meta Conversions API events.
+
+Events are put on a bounded, priority-bucketed queue and a small pool of
+worker threads packs them into the Graph API's data array, flushing when
+a batch is full or the oldest pending event has waited
+META_DISPATCH_FLUSH_INTERVAL seconds. All workers share one pooled
+GraphClient session, so connections (and TLS) are reused.
+
+Failed or slow requests back off through a CircuitBreaker; retryable
+batches go back on the queue until META_DISPATCH_MAX_ATTEMPTS. When the
+queue is full the lowest-value event is dropped first (Search before
+ViewContent before AddToCart ... before Purchase).
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+
+from django.conf import settings
+
+from .client import MAX_BATCH_SIZE, REJECTED, RETRY, CircuitBreaker, GraphClient
+
+logger = logging.getLogger(__name__)
+
+# Higher value = more important for attribution, dropped last
+EVENT_PRIORITY = {
+    'Search': 0,
+    'ViewContent': 1,
+    'AddToWishlist': 2,
+    'AddToCart': 3,
+    'InitiateCheckout': 4,
+    'Contact': 4,
+    'AddPaymentInfo': 5,
+    'Purchase': 9,
+}
+DEFAULT_PRIORITY = 2
+
+
+class MetaEventDispatcher:
+    def __init__(self, client=None, breaker=None, *, workers=None, queue_size=None,
+                 batch_size=None, flush_interval=None, max_attempts=None, slow_seconds=None):
+        self.workers = workers or getattr(settings, 'META_DISPATCH_WORKERS', 2)
+        self.queue_size = queue_size or getattr(settings, 'META_DISPATCH_QUEUE_SIZE', 5000)
+        self.batch_size = min(MAX_BATCH_SIZE, batch_size or getattr(settings, 'META_DISPATCH_BATCH_SIZE', 100))
+        self.flush_interval = flush_interval or getattr(settings, 'META_DISPATCH_FLUSH_INTERVAL', 2.0)
+        self.max_attempts = max_attempts or getattr(settings, 'META_DISPATCH_MAX_ATTEMPTS', 5)
+        self.slow_seconds = slow_seconds or getattr(settings, 'META_DISPATCH_SLOW_SECONDS', 2.0)
+        self.client = client or GraphClient(pool_size=self.workers)
+        self.breaker = breaker or CircuitBreaker(
+            threshold=getattr(settings, 'META_BREAKER_THRESHOLD', 5),
+            reset_timeout=getattr(settings, 'META_BREAKER_RESET_SECONDS', 30.0),
+        )
+        self.stats = Counter()
+        self._start_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._cond = threading.Condition()
+        self._queues: dict[int, deque] = {}
+        self._size = 0
+        self._oldest = None
+        self._threads: list[threading.Thread] = []
+        self._stopping = False
+        self._pid = os.getpid()
+
+    def _ensure_started(self):
+        # A forked worker (gunicorn --preload) inherits the queue but not the threads.
+        if self._threads and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._reset()
+            if not self._threads:
+                for i in range(self.workers):
+                    t = threading.Thread(target=self._run, name=f'meta-dispatch-{i}', daemon=True)
+                    t.start()
+                    self._threads.append(t)
+
+    # Queue ---------------------------------------------------------------
+
+    def submit(self, event: dict) -> bool:
+        """Queue an event for delivery; False if it was dropped."""
+        self._ensure_started()
+        with self._cond:
+            return self._put(event, 0)
+
+    def _put(self, event, attempts, front=False) -> bool:
+        priority = EVENT_PRIORITY.get(event.get('event_name'), DEFAULT_PRIORITY)
+        if self._size >= self.queue_size and not self._drop_below(priority):
+            self._dropped(event)
+            return False
+        bucket = self._queues.setdefault(priority, deque())
+        if front:
+            bucket.appendleft((event, attempts))
+        else:
+            bucket.append((event, attempts))
+        self._size += 1
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        if self._size == 1 or self._size >= self.batch_size:
+            self._cond.notify()
+        return True
+
+    def _drop_below(self, priority) -> bool:
+        """Make room by dropping the oldest event of the lowest priority under `priority`."""
+        for p in sorted(self._queues):
+            if p >= priority:
+                break
+            if self._queues[p]:
+                event, _ = self._queues[p].popleft()
+                self._size -= 1
+                self._dropped(event)
+                return True
+        return False
+
+    def _dropped(self, event):
+        self.stats['dropped'] += 1
+        self.stats[f"dropped:{event.get('event_name')}"] += 1
+
+    def _take(self) -> list:
+        batch = []
+        for p in sorted(self._queues, reverse=True):
+            bucket = self._queues[p]
+            while bucket and len(batch) < self.batch_size:
+                batch.append(bucket.popleft())
+        self._size -= len(batch)
+        self._oldest = time.monotonic() if self._size else None
+        if self._size:
+            self._cond.notify()
+        return batch
+
+    def pending(self) -> int:
+        return self._size
+
+    # Workers -------------------------------------------------------------
+
+    def _next_send_delay(self):
+        """Seconds to wait before taking a batch; None means wait for a submit."""
+        if not self._size:
+            return None
+        wait = self.breaker.delay()
+        if wait:
+            return wait
+        if self._stopping or self._size >= self.batch_size:
+            return 0
+        return max(0.0, self.flush_interval - (time.monotonic() - self._oldest))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopping and (not self._size or self.breaker.delay()):
+                        return
+                    delay = self._next_send_delay()
+                    if delay == 0 and self.breaker.acquire() == 0:
+                        break
+                    self._cond.wait(delay if delay is None else max(delay, 0.01))
+                batch = self._take()
+            try:
+                self._deliver(batch)
+            except Exception:
+                logger.exception('Meta event dispatcher failed to deliver a batch')
+
+    def _deliver(self, batch):
+        outcome, elapsed = self.client.send([event for event, _ in batch])
+        if outcome == RETRY:
+            self.breaker.record_failure()
+            with self._cond:
+                for event, attempts in reversed(batch):
+                    if attempts + 1 >= self.max_attempts:
+                        self.stats['failed'] += 1
+                    else:
+                        self._put(event, attempts + 1, front=True)
+            return
+        if outcome == REJECTED:
+            self.stats['rejected'] += len(batch)
+        else:
+            self.stats['sent'] += len(batch)
+        if elapsed > self.slow_seconds:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush what can be sent within `timeout`; used at interpreter exit."""
+        if self._pid != os.getpid():
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        deadline = time.monotonic() + timeout
+        for t in self._threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+        if self._size:
+            logger.warning('Meta event dispatcher exiting with %d undelivered events', self._size)
+
+
+dispatcher = MetaEventDispatcher()
+atexit.register(dispatcher.stop)
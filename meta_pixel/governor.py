@@ -0,0 +1,252 @@
+"""
+Server-side governor for high-volume tracking events.
+
+Before a Search or ViewContent event is built, the governor decides
+whether it goes out at all:
+
+* Search keystrokes from one visitor are collapsed: only the last query
+  typed within META_SEARCH_DEBOUNCE_SECONDS of the previous one is sent,
+  by a background sweeper once the visitor stops typing.
+* ViewContent is sent once per product per visitor per
+  META_VIEW_CONTENT_DEDUP_SECONDS.
+* META_EVENT_SAMPLE_RATES keeps a stable fraction of visitors per event.
+* META_EVENT_RATE_LIMIT caps governed events per client IP per minute
+  (see client_ip() and TRUSTED_PROXY_COUNT).
+
+A visitor is the session if there is one, else IP + user agent. All state
+lives in bounded in-process TTL maps (META_GOVERNOR_MAX_ENTRIES each), so
+limits are per worker process.
+"""
+import atexit
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Bounded mapping whose entries expire a fixed time after they are set."""
+
+    def __init__(self, max_entries=None):
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries or int(getattr(settings, 'META_GOVERNOR_MAX_ENTRIES', 50000))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, now=None):
+        now = now or time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                return None
+            return entry[1]
+
+    def set(self, key, value, ttl, now=None) -> list:
+        """Store value; returns the (key, value) pairs evicted to stay bounded."""
+        now = now or time.monotonic()
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (now + ttl, value)
+            return self._evict(now)
+
+    def incr(self, key, ttl, now=None) -> int:
+        """Count within a fixed window of ttl seconds starting at the first hit."""
+        now = now or time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                self._entries.pop(key, None)
+                self._entries[key] = (now + ttl, 1)
+                self._evict(now)
+                return 1
+            self._entries[key] = (entry[0], entry[1] + 1)
+            return entry[1] + 1
+
+    def pop(self, key):
+        """Remove key; returns (expires_at, value) or None."""
+        with self._lock:
+            return self._entries.pop(key, None)
+
+    def pop_expired(self, now=None) -> list:
+        now = now or time.monotonic()
+        expired = []
+        with self._lock:
+            while self._entries:
+                key, (expires_at, value) = next(iter(self._entries.items()))
+                if expires_at > now:
+                    break
+                del self._entries[key]
+                expired.append((key, value))
+        return expired
+
+    def pop_all(self) -> list:
+        with self._lock:
+            items = [(k, v) for k, (_, v) in self._entries.items()]
+            self._entries.clear()
+            return items
+
+    def _evict(self, now) -> list:
+        evicted = []
+        # Entries are in (roughly) expiry order: drop expired ones from the front first
+        while self._entries:
+            key, (expires_at, value) = next(iter(self._entries.items()))
+            if expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[key]
+            evicted.append((key, value))
+        return evicted
+
+
+def client_ip(request) -> str:
+    """
+    Client address for rate limiting.
+
+    X-Forwarded-For is client-controlled except for the hops appended by
+    our own proxies, so with TRUSTED_PROXY_COUNT = n the n-th entry from the
+    right is used; with no trusted proxy, REMOTE_ADDR.
+    """
+    hops = getattr(settings, 'TRUSTED_PROXY_COUNT', 0)
+    if hops > 0:
+        forwarded = [h.strip() for h in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if h.strip()]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def visitor_key(request) -> str:
+    session_key = request.session.session_key if hasattr(request, 'session') else None
+    if session_key:
+        return f's:{session_key}'
+    raw = f"{client_ip(request)}|{request.META.get('HTTP_USER_AGENT', '')}"
+    return 'a:' + hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+
+
+class EventGovernor:
+    def __init__(self):
+        self.views = TTLCache()
+        self.rates = TTLCache()
+        self.searches = TTLCache()
+        self._sweeper = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    # Sampling and limits ---------------------------------------------------
+
+    @staticmethod
+    def sampled(visitor: str, event_name: str) -> bool:
+        """Stable per-visitor sampling, so a sampled visitor's funnel stays whole."""
+        rate = getattr(settings, 'META_EVENT_SAMPLE_RATES', {}).get(event_name, 1.0)
+        if rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        digest = hashlib.blake2b(f'{event_name}|{visitor}'.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'big') / 2 ** 64 < rate
+
+    def rate_limited(self, request) -> bool:
+        limit = getattr(settings, 'META_EVENT_RATE_LIMIT', 120)
+        return bool(limit) and self.rates.incr(client_ip(request), 60) > limit
+
+    def allow(self, request, event_name: str, dedup_key=None) -> bool:
+        """Whether a governed event should be sent; records it if so."""
+        visitor = visitor_key(request)
+        if not self.sampled(visitor, event_name):
+            return False
+        if dedup_key is not None:
+            key = (visitor, event_name, dedup_key)
+            if self.views.get(key) is not None:
+                return False
+        if self.rate_limited(request):
+            return False
+        if dedup_key is not None:
+            self.views.set(key, True, getattr(settings, 'META_VIEW_CONTENT_DEDUP_SECONDS', 1800))
+        return True
+
+    # Search debounce -------------------------------------------------------
+
+    def debounce_search(self, request, query: str, context, send) -> None:
+        """
+        Hold query as the visitor's pending search.
+
+        context() builds the event context (user data etc.) and is only
+        called for a visitor's first keystroke; send(context, query) is
+        called for the final query once the visitor stops typing.
+        """
+        visitor = visitor_key(request)
+        if not self.sampled(visitor, 'Search'):
+            return
+        window = getattr(settings, 'META_SEARCH_DEBOUNCE_SECONDS', 3)
+        if window <= 0:
+            if not self.rate_limited(request):
+                send(context(), query)
+            return
+        now = time.monotonic()
+        entry = self.searches.pop(visitor)
+        pending = None
+        if entry is not None:
+            if entry[0] <= now:
+                self._emit([(visitor, entry[1])])
+            else:
+                pending = entry[1]
+        if pending is None:
+            if self.rate_limited(request):
+                return
+            pending = {'context': context(), 'send': send, 'started': now}
+        pending['query'] = query
+        # Continuous typing still produces an event every few windows
+        ttl = max(0.0, min(window, pending['started'] + 5 * window - now))
+        evicted = self.searches.set(visitor, pending, ttl, now)
+        self._emit(evicted)
+        self._ensure_sweeper()
+
+    def flush_searches(self, force=False) -> int:
+        items = self.searches.pop_all() if force else self.searches.pop_expired()
+        self._emit(items)
+        return len(items)
+
+    @staticmethod
+    def _emit(items) -> None:
+        for _, pending in items:
+            try:
+                pending['send'](pending['context'], pending['query'])
+            except Exception:
+                logger.exception('Failed to emit debounced Search event')
+
+    def _ensure_sweeper(self) -> None:
+        if self._sweeper is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._sweeper is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._sweeper = threading.Thread(target=self._sweep, name='meta-governor', daemon=True)
+                self._sweeper.start()
+
+    def _sweep(self) -> None:
+        while True:
+            time.sleep(max(0.1, getattr(settings, 'META_SEARCH_DEBOUNCE_SECONDS', 3) / 2))
+            try:
+                if self.flush_searches():
+                    connection.close()
+            except Exception:
+                logger.exception('Meta governor sweep failed')
+
+    def stop(self) -> None:
+        if self._pid == os.getpid():
+            self.flush_searches(force=True)
+
+
+governor = EventGovernor()
+atexit.register(governor.stop)
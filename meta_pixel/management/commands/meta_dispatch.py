@@ -0,0 +1,87 @@
+"""
+Deliver queued Meta Conversions API events from the outbox table.
+Usage: python manage.py meta_dispatch [--once] [--batch-size 100] [--lease 60] [--idle-sleep 1]
+
+Used when META_EVENT_DELIVERY = 'outbox'. Run as a long-lived worker next
+to the web processes; several workers may run at once. Failed batches are
+retried with exponential backoff, sent rows are purged periodically. --once drains what is due and exits (cron).
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from meta_pixel.client import MAX_BATCH_SIZE, REJECTED, RETRY, CircuitBreaker, GraphClient, is_configured
+from meta_pixel.outbox import claim, purge, record
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Send pending Meta Conversions API events from the outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Exit when nothing is due")
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=getattr(settings, 'META_DISPATCH_BATCH_SIZE', 100),
+        )
+        parser.add_argument('--lease', type=float, default=60.0, help="Seconds a claimed batch stays reserved")
+        parser.add_argument('--idle-sleep', type=float, default=1.0)
+        parser.add_argument('--purge-every', type=float, default=300.0, help="Seconds between purges")
+
+    def handle(self, *args, **options):
+        if not is_configured():
+            self.stderr.write("META_PIXEL_ID or META_ACCESS_TOKEN not set; nothing to do.")
+            return
+        batch_size = max(1, min(MAX_BATCH_SIZE, options['batch_size']))
+        max_attempts = getattr(settings, 'META_DISPATCH_MAX_ATTEMPTS', 5)
+        slow_seconds = getattr(settings, 'META_DISPATCH_SLOW_SECONDS', 2.0)
+        client = GraphClient(pool_size=1)
+        breaker = CircuitBreaker(
+            threshold=getattr(settings, 'META_BREAKER_THRESHOLD', 5),
+            reset_timeout=getattr(settings, 'META_BREAKER_RESET_SECONDS', 30.0),
+        )
+        sent = failed = rejected = 0
+        last_purge = 0.0
+
+        while True:
+            close_old_connections()
+            if time.monotonic() - last_purge >= options['purge_every']:
+                purged = purge()
+                if purged:
+                    logger.info('Purged %d delivered Meta events', purged)
+                last_purge = time.monotonic()
+
+            wait = breaker.acquire()
+            if wait:
+                if options['once']:
+                    break
+                time.sleep(wait)
+                continue
+
+            rows = claim(batch_size, options['lease'])
+            if not rows:
+                if options['once']:
+                    break
+                time.sleep(options['idle_sleep'])
+                continue
+
+            outcome, elapsed = client.send([row.payload for row in rows])
+            record(rows, outcome, max_attempts)
+            if outcome == RETRY:
+                breaker.record_failure()
+                failed += len(rows)
+            else:
+                if outcome == REJECTED:
+                    rejected += len(rows)
+                else:
+                    sent += len(rows)
+                if elapsed > slow_seconds:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+
+        self.stdout.write(self.style.SUCCESS(f"Delivered {sent} events, {rejected} rejected, {failed} failed attempts."))
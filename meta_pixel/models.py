@@ -0,0 +1,31 @@
+from django.db import models
+from django.utils import timezone
+
+
+class MetaEventOutbox(models.Model):
+    """Conversions API event waiting for (or done with) delivery by `meta_dispatch`."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        SENT = 'sent', 'Sent'
+        FAILED = 'failed', 'Failed'
+
+    event_name = models.CharField(max_length=50)
+    priority = models.SmallIntegerField(default=0)
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Next time the row may be claimed; a claim pushes it forward by the lease
+    available_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='meta_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_name} ({self.status})"
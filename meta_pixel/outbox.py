@@ -0,0 +1,108 @@
+"""
+Durable outbox for Meta Conversions API events.
+
+Request threads only insert MetaEventOutbox rows: Purchase inside the
+order's own transaction (so the event exists exactly when the order does),
+everything else on commit. The `meta_dispatch` command claims due rows
+with SELECT ... FOR UPDATE SKIP LOCKED, leases them by pushing
+available_at forward, sends them in batches and records the outcome, so
+several workers can run side by side and a crashed worker's rows come
+back once the lease runs out.
+"""
+import random
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .client import REJECTED, RETRY
+from .dispatcher import DEFAULT_PRIORITY, EVENT_PRIORITY
+from .models import MetaEventOutbox
+
+# Written in the caller's transaction instead of on commit
+TRANSACTIONAL_EVENTS = {'Purchase'}
+
+
+def enqueue(event: dict) -> None:
+    # A stable event_id lets Meta discard the duplicate if a lease expires mid-send
+    event.setdefault('event_id', uuid.uuid4().hex)
+    row = MetaEventOutbox(
+        event_name=event['event_name'],
+        priority=EVENT_PRIORITY.get(event['event_name'], DEFAULT_PRIORITY),
+        payload=event,
+    )
+    if event['event_name'] in TRANSACTIONAL_EVENTS:
+        row.save()
+    else:
+        transaction.on_commit(row.save)
+
+
+def claim(batch_size: int, lease_seconds: float) -> list[MetaEventOutbox]:
+    """Lease up to batch_size due rows, most important first."""
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            MetaEventOutbox.objects.filter(
+                status=MetaEventOutbox.Status.PENDING, available_at__lte=now,
+            )
+            .order_by('-priority', 'available_at')
+            .select_for_update(skip_locked=True)[:batch_size]
+        )
+        if rows:
+            MetaEventOutbox.objects.filter(pk__in=[r.pk for r in rows]).update(
+                available_at=now + timedelta(seconds=lease_seconds),
+            )
+    return rows
+
+
+def backoff_seconds(attempts: int) -> float:
+    base = getattr(settings, 'META_OUTBOX_BACKOFF_SECONDS', 30)
+    cap = getattr(settings, 'META_OUTBOX_BACKOFF_MAX_SECONDS', 3600)
+    return min(cap, base * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+
+
+def record(rows: list[MetaEventOutbox], outcome: str, max_attempts: int) -> None:
+    """Store the result of sending rows together."""
+    now = timezone.now()
+    pks = [r.pk for r in rows]
+    if outcome == REJECTED:
+        MetaEventOutbox.objects.filter(pk__in=pks).update(
+            status=MetaEventOutbox.Status.FAILED, last_error='Rejected by the Graph API',
+        )
+    elif outcome == RETRY:
+        for row in rows:
+            row.attempts += 1
+            if row.attempts >= max_attempts:
+                row.status = MetaEventOutbox.Status.FAILED
+            row.available_at = now + timedelta(seconds=backoff_seconds(row.attempts))
+            row.last_error = 'Delivery failed; will retry' if row.status == row.Status.PENDING else 'Gave up after retries'
+        MetaEventOutbox.objects.bulk_update(rows, ['attempts', 'status', 'available_at', 'last_error'])
+    else:
+        MetaEventOutbox.objects.filter(pk__in=pks).update(
+            status=MetaEventOutbox.Status.SENT, sent_at=now, attempts=F('attempts') + 1,
+        )
+
+
+def purge(batch_size: int = 1000) -> int:
+    """Delete sent rows after META_OUTBOX_KEEP_SENT_HOURS and failed ones after META_OUTBOX_KEEP_FAILED_DAYS."""
+    now = timezone.now()
+    cutoffs = (
+        (MetaEventOutbox.Status.SENT,
+         now - timedelta(hours=getattr(settings, 'META_OUTBOX_KEEP_SENT_HOURS', 24))),
+        (MetaEventOutbox.Status.FAILED,
+         now - timedelta(days=getattr(settings, 'META_OUTBOX_KEEP_FAILED_DAYS', 7))),
+    )
+    deleted = 0
+    for status, cutoff in cutoffs:
+        while True:
+            pks = list(
+                MetaEventOutbox.objects.filter(status=status, created_at__lt=cutoff)
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            deleted += MetaEventOutbox.objects.filter(pk__in=pks).delete()[0]
+    return deleted
@@ -2,34 +2,32 @@
 Meta Conversions API service.
 
 Sends server-side events to the Meta Graph API for ad attribution and
-audience optimization. All events are dispatched in a background thread
-so they never block the main request/response cycle.
+audience optimization. Events are queued on the in-process batching
+dispatcher (meta_pixel.dispatcher), or with META_EVENT_DELIVERY='outbox'
+written to the outbox table and sent by the `meta_dispatch` worker
+(meta_pixel.outbox); either way no network I/O happens in the
+request/response cycle. Search and ViewContent go through the
+governor (meta_pixel.governor) first: debounced, deduplicated, sampled
+and rate limited.
 
 PII fields (email, phone, name, etc.) are SHA-256 hashed before
 transmission as required by Meta's data policy.
 """
 import hashlib
 import logging
-import threading
 import time
 
-import requests
 from django.conf import settings
 
-logger = logging.getLogger(__name__)
-
+from . import outbox
+from .client import is_configured
+from .dispatcher import dispatcher
+from .governor import governor
 
-def _get_meta_settings():
-    return {
-        'pixel_id': getattr(settings, 'META_PIXEL_ID', ''),
-        'access_token': getattr(settings, 'META_ACCESS_TOKEN', ''),
-        'api_version': getattr(settings, 'META_API_VERSION', 'v25.0'),
-        'test_event_code': getattr(settings, 'META_TEST_EVENT_CODE', ''),
-    }
+logger = logging.getLogger(__name__)
 
 
 class MetaConversionsService:
-    API_URL = 'https://graph.facebook.com/{version}/{pixel_id}/events'
 
     # ---------------------------------------------------------------------------
     # Private helpers
@@ -99,7 +97,7 @@ class MetaConversionsService:
             or None
         )
 
-    def _send(
+    def _send_async(
         self,
         event_name: str,
         user_data: dict,
@@ -107,18 +105,11 @@ class MetaConversionsService:
         event_id: str | None = None,
         source_url: str | None = None,
     ) -> None:
-        """
-        POST a single event to the Meta Conversions API.
-        Called from a background thread — exceptions are caught and logged.
-        """
-        cfg = _get_meta_settings()
-        if not cfg['pixel_id'] or not cfg['access_token']:
+        """Build the event and hand it to the outbox or dispatcher; never blocks on the network."""
+        if not is_configured():
             logger.debug('META_PIXEL_ID or META_ACCESS_TOKEN not set; skipping event %s', event_name)
             return
 
-        url = self.API_URL.format(version=cfg['api_version'], pixel_id=cfg['pixel_id'])
-        params = {'access_token': cfg['access_token']}
-
         event: dict = {
             'event_name': event_name,
             'event_time': int(time.time()),
@@ -132,44 +123,42 @@ class MetaConversionsService:
         if custom_data:
             event['custom_data'] = custom_data
 
-        payload: dict = {'data': [event]}
-        if cfg['test_event_code']:
-            payload['test_event_code'] = cfg['test_event_code']
-
-        try:
-            resp = requests.post(url, params=params, json=payload, timeout=5)
-            if not resp.ok:
-                logger.warning(
-                    'Meta Conversions API error for event %s: %s %s',
-                    event_name, resp.status_code, resp.text,
-                )
-            else:
-                logger.debug('Meta Conversions API event sent: %s', event_name)
-        except Exception:
-            logger.exception('Failed to send Meta Conversions API event: %s', event_name)
-
-    def _send_async(self, *args, **kwargs) -> None:
-        """Fire-and-forget: dispatch _send in a daemon thread."""
-        t = threading.Thread(target=self._send, args=args, kwargs=kwargs, daemon=True)
-        t.start()
+        if getattr(settings, 'META_EVENT_DELIVERY', 'dispatcher') == 'outbox':
+            outbox.enqueue(event)
+        elif not dispatcher.submit(event):
+            logger.debug('Meta event queue full; dropped %s', event_name)
 
     # ---------------------------------------------------------------------------
     # Public event methods
     # ---------------------------------------------------------------------------
 
     def track_search(self, request, query: str) -> None:
-        """Search event — fired when a product search query is executed."""
-        user_data = self._build_user_data(request)
-        custom_data = {'search_string': query} if query else {}
+        """
+        Search event — fired when a product search query is executed.
+        Keystrokes are collapsed by the governor into the final query.
+        """
+        if not query or not is_configured():
+            return
+        governor.debounce_search(
+            request,
+            query,
+            context=lambda: (self._build_user_data(request), self._get_event_source_url(request)),
+            send=self._send_search,
+        )
+
+    def _send_search(self, context, query: str) -> None:
+        user_data, source_url = context
         self._send_async(
             'Search',
             user_data,
-            custom_data=custom_data or None,
-            source_url=self._get_event_source_url(request),
+            custom_data={'search_string': query},
+            source_url=source_url,
         )
 
     def track_view_content(self, request, product) -> None:
-        """ViewContent event — fired when a product detail page is viewed."""
+        """ViewContent event — fired when a product detail page is viewed (deduped per visitor)."""
+        if not is_configured() or not governor.allow(request, 'ViewContent', dedup_key=product.id):
+            return
         user_data = self._build_user_data(request)
         custom_data = {
             'content_ids': [str(product.id)],
@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.utils.html import format_html
 
-from .models import Order, OrderItem
+from .models import ArchivedOrder, Order, OrderItem, ShippingRate
+from .tracking import refresh_tracking_document
 
 
 class OrderItemInline(admin.TabularInline):
@@ -10,10 +11,6 @@ class OrderItemInline(admin.TabularInline):
     fields = ('product_name', 'quantity', 'price')
     readonly_fields = ('product_name',)
 
-    @admin.display(description='Product name')
-    def product_name(self, obj: OrderItem):
-        return getattr(obj.product, 'name', '') or str(obj.product_id)
-
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
@@ -31,9 +28,16 @@ class OrderAdmin(admin.ModelAdmin):
     )
     exclude = ('user',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('items')
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        refresh_tracking_document(obj)
+
     @admin.display(description='Products')
     def product_names(self, obj: Order):
-        names = [oi.product.name for oi in obj.items.select_related('product').all()]
+        names = [oi.product_name or str(oi.product_id) for oi in obj.items.all()]
         if not names:
             return ''
         if len(names) <= 3:
@@ -45,3 +49,23 @@ class OrderAdmin(admin.ModelAdmin):
             'white-space:nowrap;overflow:hidden;text-overflow:ellipsis">{}</span>',
             text, text,
         )
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = ['order_number', 'shipping_name', 'phone', 'status', 'total', 'created_at', 'archived_at']
+    list_filter = ['status', 'delivery_area']
+    search_fields = ['order_number', 'shipping_name', 'phone']
+    exclude = ('user', 'tracking_document')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ShippingRate)
+class ShippingRateAdmin(admin.ModelAdmin):
+    list_display = ['delivery_area', 'amount', 'updated_at']
+    list_editable = ['amount']
@@ -1,19 +1,12 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 
 from .models import Order, OrderItem
 
 
 class AdminOrderItemSerializer(serializers.ModelSerializer):
-    product_name = serializers.CharField(source='product.name', read_only=True)
-    product_brand = serializers.CharField(source='product.brand', read_only=True)
+    product = serializers.UUIDField(source='product_id', read_only=True)
     product_image = serializers.SerializerMethodField()
-    original_price = serializers.DecimalField(
-        source='product.original_price',
-        max_digits=10,
-        decimal_places=2,
-        allow_null=True,
-        read_only=True,
-    )
 
     class Meta:
         model = OrderItem
@@ -21,16 +14,19 @@ class AdminOrderItemSerializer(serializers.ModelSerializer):
             'id', 'product', 'product_name', 'product_brand', 'product_image',
             'quantity', 'size', 'price', 'original_price',
         ]
-        read_only_fields = ['id']
+        read_only_fields = [
+            'id', 'product_name', 'product_brand', 'original_price',
+        ]
 
     def get_product_image(self, obj):
-        if obj.product.image and hasattr(obj.product.image, 'url'):
-            return obj.product.image.url
+        if obj.product_image:
+            return default_storage.url(obj.product_image)
         return None
 
 
 class AdminOrderListSerializer(serializers.ModelSerializer):
-    items_count = serializers.SerializerMethodField()
+    """Expects the queryset to be annotated with items_count (see with_items_count)."""
+    items_count = serializers.IntegerField(read_only=True)
     delivery_area_label = serializers.CharField(
         source='get_delivery_area_display', read_only=True,
     )
@@ -43,9 +39,6 @@ class AdminOrderListSerializer(serializers.ModelSerializer):
             'delivery_area_label', 'items_count', 'created_at', 'updated_at',
         ]
 
-    def get_items_count(self, obj):
-        return obj.items.count()
-
 
 class AdminOrderSerializer(serializers.ModelSerializer):
     items = AdminOrderItemSerializer(many=True, read_only=True)
@@ -68,3 +61,18 @@ class AdminOrderSerializer(serializers.ModelSerializer):
 
 class AdminOrderStatusSerializer(serializers.Serializer):
     status = serializers.ChoiceField(choices=Order.Status.choices)
+
+
+class AdminOrderBulkItemSerializer(serializers.Serializer):
+    order_number = serializers.CharField(max_length=20)
+    status = serializers.ChoiceField(choices=Order.Status.choices, required=False)
+    tracking_number = serializers.CharField(max_length=100, required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        if 'status' not in attrs and 'tracking_number' not in attrs:
+            raise serializers.ValidationError('Provide status and/or tracking_number.')
+        return attrs
+
+
+class AdminOrderBulkUpdateSerializer(serializers.Serializer):
+    updates = AdminOrderBulkItemSerializer(many=True, allow_empty=False, max_length=1000)
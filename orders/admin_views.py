@@ -1,12 +1,20 @@
+from django.db import transaction
+from django.http import Http404
 from rest_framework import viewsets, mixins
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from config.permissions import IsStaffUser
-from core.activity import log_activity
+from core import counters
+from core.activity import build_activity_log, log_activity
+from core.export import ExportMixin
 from core.models import ActivityLog
-from .models import Order
+from .archive import routed_orders
+from .filters import filter_orders
+from .models import ArchivedOrder, Order, with_items_count
+from .tracking import refresh_tracking_document, render_tracking_document
 from .admin_serializers import (
+    AdminOrderBulkUpdateSerializer,
     AdminOrderListSerializer,
     AdminOrderSerializer,
     AdminOrderStatusSerializer,
@@ -14,6 +22,7 @@ from .admin_serializers import (
 
 
 class AdminOrderViewSet(
+    ExportMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
@@ -21,8 +30,63 @@ class AdminOrderViewSet(
     viewsets.GenericViewSet,
 ):
     permission_classes = [IsStaffUser]
-    queryset = Order.objects.prefetch_related('items__product').all()
+    queryset = Order.objects.prefetch_related('items').all()
     lookup_field = 'pk'
+    export_filename = 'orders'
+    export_fields = {
+        'order_number': 'order__order_number',
+        'created_at': 'order__created_at',
+        'status': 'order__status',
+        'total': 'order__total',
+        'email': 'order__email',
+        'shipping_name': 'order__shipping_name',
+        'phone': 'order__phone',
+        'district': 'order__district',
+        'delivery_area': 'order__delivery_area',
+        'shipping_address': 'order__shipping_address',
+        'tracking_number': 'order__tracking_number',
+        'product_id': 'product_id',
+        'product_name': 'product_name',
+        'product_brand': 'product_brand',
+        'quantity': 'quantity',
+        'size': 'size',
+        'price': 'price',
+    }
+
+    def get_queryset(self):
+        if self.action == 'list':
+            # Routed by date range: hot, archived, or both across the cutoff.
+            params = self.request.query_params
+            return routed_orders(
+                params,
+                lambda order_model, _: filter_orders(with_items_count(order_model.objects.all()), params),
+            )
+        return super().get_queryset()
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            if self.action != 'retrieve':
+                raise
+            order = ArchivedOrder.objects.prefetch_related('items').filter(
+                pk=self.kwargs[self.lookup_url_kwarg or self.lookup_field],
+            ).first()
+            if order is None:
+                raise
+            return order
+
+    def get_export_queryset(self):
+        """One row per order item, for the orders matching the list filters."""
+        params = self.request.query_params
+
+        def items(order_model, item_model):
+            orders = filter_orders(order_model.objects.all(), params)
+            return item_model.objects.filter(
+                order__in=orders.values('pk'),
+            ).order_by('-order__created_at', 'pk')
+
+        return routed_orders(params, items)
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -37,6 +101,7 @@ class AdminOrderViewSet(
         prev_status = order.status
         order.status = serializer.validated_data['status']
         order.save(update_fields=['status'])
+        refresh_tracking_document(order)
         if prev_status != order.status:
             log_activity(
                 request=request,
@@ -55,6 +120,7 @@ class AdminOrderViewSet(
         tracking = request.data.get('tracking_number', '')
         order.tracking_number = tracking
         order.save(update_fields=['tracking_number'])
+        refresh_tracking_document(order)
         if (prev_tracking or "") != (tracking or ""):
             log_activity(
                 request=request,
@@ -66,6 +132,93 @@ class AdminOrderViewSet(
             )
         return Response(AdminOrderSerializer(order).data)
 
+    @action(detail=False, methods=['post'], url_path='bulk-update')
+    def bulk_update(self, request):
+        """
+        Apply many status and/or tracking number changes in one transaction.
+
+        Body: {"updates": [{"order_number": "00000012", "status": "confirmed",
+        "tracking_number": "..."}, ...]}. Returns one compact result per entry.
+        """
+        serializer = AdminOrderBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updates = serializer.validated_data['updates']
+
+        results = []
+        with transaction.atomic():
+            orders = {
+                o.order_number: o for o in Order.objects.select_for_update().filter(
+                    order_number__in={u['order_number'] for u in updates},
+                ).prefetch_related('items')
+            }
+            changed = {}
+            logs = []
+            deltas = {}
+            for update in updates:
+                order = orders.get(update['order_number'])
+                if order is None:
+                    results.append({
+                        'order_number': update['order_number'],
+                        'ok': False,
+                        'error': 'Order not found.',
+                    })
+                    continue
+
+                updated = False
+                if 'status' in update and update['status'] != order.status:
+                    prev_status = order.status
+                    order.status = update['status']
+                    updated = True
+                    # bulk_update() bypasses signals, so move the dashboard counters here.
+                    for key, delta in counters.order_deltas(
+                        (prev_status, order.total), (order.status, order.total),
+                    ).items():
+                        deltas[key] = deltas.get(key, 0) + delta
+                    logs.append(build_activity_log(
+                        request=request,
+                        action=ActivityLog.Action.CUSTOM,
+                        entity_type="order",
+                        entity_id=order.pk,
+                        summary=f"Order {order.order_number} status changed: {prev_status} → {order.status}",
+                        metadata={"from": prev_status, "to": order.status, "bulk": True},
+                    ))
+                if 'tracking_number' in update and update['tracking_number'] != (order.tracking_number or ''):
+                    prev_tracking = order.tracking_number or ''
+                    order.tracking_number = update['tracking_number']
+                    updated = True
+                    logs.append(build_activity_log(
+                        request=request,
+                        action=ActivityLog.Action.CUSTOM,
+                        entity_type="order",
+                        entity_id=order.pk,
+                        summary=f"Order {order.order_number} tracking updated",
+                        metadata={"from": prev_tracking, "to": order.tracking_number, "bulk": True},
+                    ))
+                if updated:
+                    changed[order.pk] = order
+                results.append({
+                    'order_number': order.order_number,
+                    'ok': True,
+                    'changed': updated,
+                    'status': order.status,
+                    'tracking_number': order.tracking_number,
+                })
+
+            for order in changed.values():
+                order.tracking_document = render_tracking_document(order)
+            Order.objects.bulk_update(
+                changed.values(),
+                ['status', 'tracking_number', 'tracking_document'],
+                batch_size=500,
+            )
+            ActivityLog.objects.bulk_create(logs, batch_size=500)
+            counters.adjust(deltas)
+
+        return Response({'updated': len(changed), 'results': results})
+
+    def perform_update(self, serializer):
+        refresh_tracking_document(serializer.save())
+
     def perform_destroy(self, instance):
         pk = instance.pk
         order_number = getattr(instance, "order_number", "")
@@ -0,0 +1,349 @@
+"""
+In-memory columnar cache of sales facts for the admin analytics endpoints.
+
+Orders and order items (archived ones included) are extracted into NumPy
+arrays: local dates as integer days, districts/products/subcategories as
+dictionary-encoded integer codes, amounts in minor units. Each array set is
+kept sorted by day, so a date range is a searchsorted() slice and grouped
+totals are a bincount() over the codes; no GROUP BY runs on the database.
+
+The cache is per process. It is topped up incrementally from a high-water
+mark on created_at every ANALYTICS_REFRESH_SECONDS and rebuilt from scratch
+every ANALYTICS_FULL_REFRESH_SECONDS, which picks up status changes (e.g.
+cancellations) of orders already loaded. Both run on a background thread
+while requests keep reading the current facts; a rebuild is swapped in
+once complete. Only the first request in a process waits for a load.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from core.counters import from_minor, to_minor
+from products.models import Product
+
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+logger = logging.getLogger(__name__)
+
+EPOCH = date(1970, 1, 1)
+# Re-read this far behind the high-water mark so orders committed late
+# with an earlier created_at are not missed; ids already loaded inside the
+# overlap are skipped.
+HIGH_WATER_OVERLAP = timedelta(minutes=5)
+CHUNK_SIZE = 2000
+
+GROUP_BY_ORDER = ('district', 'hour')
+GROUP_BY_ITEM = ('product', 'subcategory')
+GROUP_BY_CHOICES = GROUP_BY_ORDER + GROUP_BY_ITEM
+
+
+def day_number(day: date) -> int:
+    return (day - EPOCH).days
+
+
+def _from_minor(value) -> str:
+    return str(from_minor(int(value)))
+
+
+class _Codes:
+    """Dictionary encoding for a categorical column."""
+
+    def __init__(self):
+        self.keys: list = []
+        self.labels: list = []
+        self._index: dict = {}
+
+    def code(self, key, label=None) -> int:
+        code = self._index.get(key)
+        if code is None:
+            code = len(self.keys)
+            self._index[key] = code
+            self.keys.append(key)
+            self.labels.append(key if label is None else label)
+        return code
+
+    def __len__(self):
+        return len(self.labels)
+
+
+def _sorted_by_day(columns: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    order = np.argsort(columns['day'], kind='stable')
+    return {name: values[order] for name, values in columns.items()}
+
+
+class SalesFacts:
+    """Order-grain and item-grain fact arrays plus their code dictionaries."""
+
+    ORDER_COLUMNS = {
+        'day': np.int32, 'hour': np.int8, 'district': np.int32,
+        'total': np.int64, 'units': np.int32, 'cancelled': np.bool_,
+    }
+    ITEM_COLUMNS = {
+        'day': np.int32, 'product': np.int32, 'amount': np.int64,
+        'quantity': np.int32, 'cancelled': np.bool_,
+    }
+
+    def __init__(self):
+        self.districts = _Codes()
+        self.products = _Codes()
+        self.subcategories = _Codes()
+        # Subcategory code per product code
+        self.product_subcategory = np.empty(0, dtype=np.int32)
+        self.orders = {name: np.empty(0, dtype=t) for name, t in self.ORDER_COLUMNS.items()}
+        self.items = {name: np.empty(0, dtype=t) for name, t in self.ITEM_COLUMNS.items()}
+        # created_at of loaded orders still inside the overlap window
+        self.recent_ids: dict = {}
+        self.high_water = None
+
+    # Extraction --------------------------------------------------------
+
+    def load(self) -> int:
+        """Append orders created after the high-water mark; returns how many were added."""
+        since = self.high_water - HIGH_WATER_OVERLAP if self.high_water else None
+        new_orders = {}
+        for order_model in (Order, ArchivedOrder):
+            qs = order_model.objects.order_by('created_at')
+            if since is not None:
+                qs = qs.filter(created_at__gt=since)
+            rows = qs.values_list('id', 'created_at', 'district', 'total', 'status')
+            for pk, created_at, district, total, status in rows.iterator(chunk_size=CHUNK_SIZE):
+                if pk in self.recent_ids:
+                    continue
+                local = timezone.localtime(created_at)
+                self.recent_ids[pk] = created_at
+                new_orders[pk] = [
+                    day_number(local.date()), local.hour,
+                    self.districts.code(district or ''), to_minor(total), 0,
+                    status == Order.Status.CANCELLED,
+                ]
+                if self.high_water is None or created_at > self.high_water:
+                    self.high_water = created_at
+        self._forget_before(self.high_water - HIGH_WATER_OVERLAP if self.high_water else None)
+        if not new_orders:
+            return 0
+
+        item_rows = []
+        new_products = []
+        for item_model in (OrderItem, ArchivedOrderItem):
+            qs = item_model.objects.all()
+            if since is not None:
+                qs = qs.filter(order__created_at__gt=since)
+            rows = qs.values_list('order_id', 'product_id', 'product_name', 'price', 'quantity')
+            for order_id, product_id, name, price, quantity in rows.iterator(chunk_size=CHUNK_SIZE):
+                order = new_orders.get(order_id)
+                if order is None:
+                    continue
+                known = len(self.products)
+                code = self.products.code(product_id, name)
+                if code == known:
+                    new_products.append(product_id)
+                order[4] += quantity
+                item_rows.append((order[0], code, to_minor(price) * quantity, quantity, order[5]))
+
+        self._map_subcategories(new_products)
+        self.orders = self._append(self.orders, self.ORDER_COLUMNS, list(new_orders.values()))
+        self.items = self._append(self.items, self.ITEM_COLUMNS, item_rows)
+        return len(new_orders)
+
+    def _forget_before(self, since) -> None:
+        """Drop ids the next load() can no longer see again."""
+        if since is None:
+            return
+        self.recent_ids = {
+            pk: created_at for pk, created_at in self.recent_ids.items() if created_at > since
+        }
+
+    def _map_subcategories(self, product_ids) -> None:
+        if not product_ids:
+            return
+        names = dict(
+            Product.objects.filter(id__in=product_ids).values_list('id', 'sub_category__name')
+        )
+        codes = [
+            self.subcategories.code(names.get(pid) or '') for pid in product_ids
+        ]
+        self.product_subcategory = np.concatenate([
+            self.product_subcategory, np.asarray(codes, dtype=np.int32),
+        ])
+
+    @staticmethod
+    def _append(current, dtypes, rows):
+        if not rows:
+            return current
+        columns = list(zip(*rows))
+        merged = {
+            name: np.concatenate([current[name], np.asarray(values, dtype=dtypes[name])])
+            for name, values in zip(dtypes, columns)
+        }
+        return _sorted_by_day(merged)
+
+    # Queries -----------------------------------------------------------
+
+    @staticmethod
+    def _window(columns, start: date, end: date):
+        """Row slice for local days start..end (inclusive), minus cancelled orders."""
+        days = columns['day']
+        lo = np.searchsorted(days, day_number(start), side='left')
+        hi = np.searchsorted(days, day_number(end), side='right')
+        keep = ~columns['cancelled'][lo:hi]
+        return {name: values[lo:hi][keep] for name, values in columns.items()}
+
+    def revenue_by(self, group_by: str, start: date, end: date, limit: int | None = None) -> list[dict]:
+        """Revenue and volume per district / hour / product / subcategory."""
+        if group_by in GROUP_BY_ORDER:
+            rows = self._window(self.orders, start, end)
+            if group_by == 'hour':
+                codes, labels = rows['hour'].astype(np.intp), list(range(24))
+            else:
+                codes, labels = rows['district'], self.districts.labels
+            size = len(labels)
+            revenue = np.bincount(codes, weights=rows['total'], minlength=size)
+            counts = np.bincount(codes, minlength=size)
+            units = np.bincount(codes, weights=rows['units'], minlength=size)
+            count_key = 'orders'
+        else:
+            rows = self._window(self.items, start, end)
+            codes = rows['product']
+            if group_by == 'subcategory':
+                codes = self.product_subcategory[codes]
+                labels = self.subcategories.labels
+            else:
+                labels = self.products.labels
+            size = len(labels)
+            revenue = np.bincount(codes, weights=rows['amount'], minlength=size)
+            counts = np.bincount(codes, minlength=size)
+            units = np.bincount(codes, weights=rows['quantity'], minlength=size)
+            count_key = 'lines'
+
+        present = np.flatnonzero(counts)
+        if group_by == 'hour':
+            ranked = present
+        else:
+            ranked = present[np.argsort(-revenue[present], kind='stable')]
+        if limit:
+            ranked = ranked[:limit]
+        result = []
+        for code in ranked:
+            entry = {
+                'label': labels[code],
+                'revenue': _from_minor(round(revenue[code])),
+                count_key: int(counts[code]),
+                'units': int(round(units[code])),
+            }
+            if group_by == 'product':
+                entry['product_id'] = str(self.products.keys[code])
+            result.append(entry)
+        return result
+
+    def order_values(self, start: date, end: date, max_basket: int = 10) -> dict:
+        """Average order value, order value percentiles and basket-size distribution."""
+        rows = self._window(self.orders, start, end)
+        totals = rows['total']
+        count = int(totals.size)
+        if not count:
+            return {
+                'orders': 0, 'revenue': '0.00', 'average_order_value': '0.00',
+                'percentiles': {}, 'basket_sizes': [],
+            }
+        percentiles = np.percentile(totals, [25, 50, 75, 90])
+        sizes = np.bincount(np.minimum(rows['units'], max_basket), minlength=max_basket + 1)
+        return {
+            'orders': count,
+            'revenue': _from_minor(int(totals.sum())),
+            'average_order_value': _from_minor(round(totals.mean())),
+            'percentiles': {
+                f'p{p}': _from_minor(round(v)) for p, v in zip((25, 50, 75, 90), percentiles)
+            },
+            'basket_sizes': [
+                {
+                    'items': f'{n}+' if n == max_basket else str(n),
+                    'orders': int(sizes[n]),
+                }
+                for n in range(1, max_basket + 1)
+            ],
+        }
+
+
+_facts: SalesFacts | None = None
+_refreshed_at = 0.0
+_rebuilt_at = 0.0
+_refreshing = False
+_lock = threading.Lock()
+# Held for the duration of a load, so only one runs per process.
+_load_lock = threading.Lock()
+
+
+def _publish(facts: SalesFacts) -> None:
+    global _facts, _refreshed_at, _rebuilt_at
+    with _lock:
+        _facts = facts
+        _rebuilt_at = _refreshed_at = time.monotonic()
+
+
+def _refresh(rebuild: bool) -> None:
+    """Top up or rebuild the facts; a rebuilt set replaces the old one when done."""
+    global _refreshed_at, _refreshing
+    try:
+        with _load_lock:
+            if rebuild:
+                facts = SalesFacts()
+                facts.load()
+                _publish(facts)
+            else:
+                # Only this thread mutates the facts; load() publishes new arrays
+                # by reassigning them, so concurrent readers see old or new.
+                _facts.load()
+                with _lock:
+                    _refreshed_at = time.monotonic()
+    except Exception:
+        logger.exception('Sales facts refresh failed; serving the previous facts')
+    finally:
+        with _lock:
+            _refreshing = False
+
+
+def _refresh_in_background(rebuild: bool) -> None:
+    def run():
+        try:
+            _refresh(rebuild)
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, name='sales-facts-refresh', daemon=True).start()
+
+
+def get_sales_facts() -> SalesFacts:
+    """
+    Return the process-wide fact cache. Stale facts are served as they are
+    while a background thread refreshes them.
+    """
+    global _refreshing
+    refresh_every = getattr(settings, 'ANALYTICS_REFRESH_SECONDS', 60)
+    rebuild_every = getattr(settings, 'ANALYTICS_FULL_REFRESH_SECONDS', 3600)
+    with _lock:
+        facts = _facts
+        now = time.monotonic()
+        rebuild = now - _rebuilt_at >= rebuild_every
+        stale = rebuild or now - _refreshed_at >= refresh_every
+        start = facts is not None and stale and not _refreshing
+        if start:
+            _refreshing = True
+    if facts is None:
+        # Nothing to serve yet: the first request waits for the initial load.
+        with _load_lock:
+            if _facts is None:
+                facts = SalesFacts()
+                facts.load()
+                _publish(facts)
+        return _facts
+    if start:
+        _refresh_in_background(rebuild)
+    return facts
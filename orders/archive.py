@@ -0,0 +1,199 @@
+"""
+Hot/cold storage for orders.
+
+Orders older than ORDER_ARCHIVE_AFTER_DAYS are moved by the archive_orders
+command from Order/OrderItem into ArchivedOrder/ArchivedOrderItem, keeping
+the hot tables (and every admin and customer query on them) small. Lookups
+by order number fall back to the archive transparently; list queries are
+routed by their date range: recent by default, both tables only for
+ranges that cross the cutoff.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.counters import suspend_counters
+from core.dates import local_day_start, parse_date
+
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+from .tracking import render_tracking_document
+
+ORDER_FIELDS = [
+    'id', 'order_number', 'user_id', 'email', 'status', 'total',
+    'shipping_name', 'shipping_address', 'phone', 'delivery_area',
+    'district', 'tracking_number', 'tracking_document',
+    'created_at', 'updated_at',
+]
+ITEM_FIELDS = [
+    'product_id', 'quantity', 'size', 'price', 'product_name',
+    'product_brand', 'product_slug', 'product_image', 'category_slug',
+    'original_price',
+]
+
+
+def archive_cutoff():
+    """Orders created before this moment belong in the archive."""
+    days = int(getattr(settings, 'ORDER_ARCHIVE_AFTER_DAYS', 365))
+    return timezone.now() - timedelta(days=days)
+
+
+HOT = 'hot'
+ARCHIVE = 'archive'
+BOTH = 'both'
+
+
+def archive_route(params) -> str:
+    """
+    Which tables a list request reads: HOT, ARCHIVE or BOTH.
+
+    Recent orders are the default: without ?archived or a start_date before
+    the archive cutoff only the hot table is read. ?archived=true reads the
+    archive, and so does a range ending before the cutoff; a range that
+    starts before the cutoff and ends after it (or is open-ended) reads both.
+    """
+    if (params.get('archived') or '').lower() in ('1', 'true'):
+        return ARCHIVE
+    cutoff = archive_cutoff()
+    end = parse_date(params.get('end_date'))
+    if end and local_day_start(end + timedelta(days=1)) <= cutoff:
+        return ARCHIVE
+    start = parse_date(params.get('start_date'))
+    if start and local_day_start(start) < cutoff:
+        return BOTH
+    return HOT
+
+
+def routed_orders(params, build):
+    """
+    Run build(order_model, item_model) against the tables archive_route()
+    picks; two querysets are combined into a CombinedOrderQuerySet.
+    """
+    route = archive_route(params)
+    if route == HOT:
+        return build(Order, OrderItem)
+    if route == ARCHIVE:
+        return build(ArchivedOrder, ArchivedOrderItem)
+    return CombinedOrderQuerySet(build(Order, OrderItem), build(ArchivedOrder, ArchivedOrderItem))
+
+
+class CombinedOrderQuerySet:
+    """
+    Hot and archived orders read as one list ordered by created_at.
+
+    archive_orders always moves the oldest orders, so every archived order
+    is older than every hot one: newest first, the list is the hot rows
+    followed by the archived rows (the other way round oldest first). A
+    slice is therefore pushed down as an OFFSET/LIMIT on the table(s) it
+    falls in, and the hot table is only counted when a slice starts past
+    its last row. Implements the part of the QuerySet API the list views,
+    paginators and exports use.
+    """
+    ordered = True
+
+    def __init__(self, hot, archived, ordering=('-created_at',)):
+        self.hot = hot
+        self.archived = archived
+        self.ordering = tuple(ordering)
+
+    def _chain(self, method, *args, **kwargs):
+        return CombinedOrderQuerySet(
+            getattr(self.hot, method)(*args, **kwargs),
+            getattr(self.archived, method)(*args, **kwargs),
+            ordering=self.ordering,
+        )
+
+    def _sides(self):
+        newest_first = not self.ordering or self.ordering[0].startswith('-')
+        return (self.hot, self.archived) if newest_first else (self.archived, self.hot)
+
+    def filter(self, *args, **kwargs):
+        return self._chain('filter', *args, **kwargs)
+
+    def values_list(self, *fields, **kwargs):
+        return self._chain('values_list', *fields, **kwargs)
+
+    def order_by(self, *fields):
+        combined = self._chain('order_by', *fields)
+        combined.ordering = fields
+        return combined
+
+    def count(self) -> int:
+        return self.hot.count() + self.archived.count()
+
+    def __len__(self):
+        return self.count()
+
+    def exists(self) -> bool:
+        return self.hot.exists() or self.archived.exists()
+
+    def iterator(self, chunk_size=2000):
+        for qs in self._sides():
+            yield from qs.iterator(chunk_size=chunk_size)
+
+    def __iter__(self):
+        return iter(self[0:None])
+
+    def __getitem__(self, k):
+        if isinstance(k, int):
+            return self[k:k + 1][0]
+        offset, stop = k.start or 0, k.stop
+        first, second = self._sides()
+        if stop is None:
+            rows = list(first[offset:])
+        else:
+            rows = list(first[offset:stop])
+        if stop is not None and len(rows) >= stop - offset:
+            return rows
+        # The slice runs past the first table: find where it resumes in the second.
+        skip = 0 if rows or not offset else offset - first.count()
+        if skip < 0:
+            return rows
+        end = None if stop is None else skip + (stop - offset) - len(rows)
+        return rows + list(second[skip:end])
+
+
+def archive_batch(before, batch_size: int = 500) -> int:
+    """Move one batch of orders created before `before` into the archive."""
+    with transaction.atomic():
+        orders = list(
+            Order.objects.filter(created_at__lt=before)
+            .order_by('created_at')
+            .select_for_update(skip_locked=True)
+            .prefetch_related('items')[:batch_size]
+        )
+        if not orders:
+            return 0
+
+        archived = []
+        items = []
+        for order in orders:
+            if not order.tracking_document:
+                order.tracking_document = render_tracking_document(order)
+            archived_order = ArchivedOrder(**{f: getattr(order, f) for f in ORDER_FIELDS})
+            archived.append(archived_order)
+            items.extend(
+                ArchivedOrderItem(order=archived_order, **{f: getattr(item, f) for f in ITEM_FIELDS})
+                for item in order.items.all()
+            )
+        ArchivedOrder.objects.bulk_create(archived)
+        ArchivedOrderItem.objects.bulk_create(items)
+
+        ids = [o.pk for o in orders]
+        # Archived orders still count towards the dashboard totals.
+        with suspend_counters():
+            OrderItem.objects.filter(order_id__in=ids).delete()
+            Order.objects.filter(pk__in=ids).delete()
+    return len(orders)
+
+
+def archive_orders(before=None, batch_size: int = 500) -> int:
+    """Move all orders created before `before` (default: the cutoff) to the archive."""
+    before = before or archive_cutoff()
+    moved = 0
+    while True:
+        count = archive_batch(before, batch_size)
+        moved += count
+        if count < batch_size:
+            return moved
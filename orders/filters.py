@@ -0,0 +1,45 @@
+"""Query-parameter filters shared by the admin order list and exports."""
+from django.db.models import Q
+
+from core.dates import day_range_lookups, parse_date
+
+
+def filter_orders(qs, params):
+    """
+    Apply admin order filters from query params.
+
+    Supported: status (comma-separated), start_date/end_date (YYYY-MM-DD,
+    inclusive local days), district, delivery_area, phone and q (order
+    number or shipping name).
+    """
+    statuses = [s.strip() for s in (params.get('status') or '').split(',') if s.strip()]
+    if statuses:
+        qs = qs.filter(status__in=statuses)
+
+    qs = qs.filter(**day_range_lookups(
+        'created_at',
+        parse_date(params.get('start_date')),
+        parse_date(params.get('end_date')),
+    ))
+
+    district = (params.get('district') or '').strip()
+    if district:
+        qs = qs.filter(district=district)
+
+    delivery_area = (params.get('delivery_area') or '').strip()
+    if delivery_area:
+        qs = qs.filter(delivery_area=delivery_area)
+
+    # Phones are stored as bare digits (see DirectOrderCreateSerializer).
+    phone = ''.join(c for c in (params.get('phone') or '') if c.isdigit())
+    if phone:
+        qs = qs.filter(phone=phone)
+
+    q = (params.get('q') or '').strip()
+    if q:
+        match = Q(shipping_name__icontains=q)
+        if q.isdigit():
+            match |= Q(order_number=q) | Q(order_number=q.zfill(8))
+        qs = qs.filter(match)
+
+    return qs
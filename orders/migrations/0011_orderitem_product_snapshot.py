@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:02
+
+from django.db import migrations, models
+
+SNAPSHOT_FIELDS = [
+    'product_name', 'product_brand', 'product_slug',
+    'product_image', 'category_slug', 'original_price',
+]
+
+
+def backfill_snapshots(apps, schema_editor):
+    """Copy product details into the new snapshot fields of existing items."""
+    OrderItem = apps.get_model('orders', 'OrderItem')
+
+    batch = []
+    items = OrderItem.objects.select_related('product__category').order_by('pk')
+    for item in items.iterator(chunk_size=500):
+        product = item.product
+        item.product_name = product.name
+        item.product_brand = product.brand
+        item.product_slug = product.slug
+        item.product_image = product.image.name if product.image else ''
+        item.category_slug = product.category.slug if product.category_id else ''
+        item.original_price = product.original_price
+        batch.append(item)
+        if len(batch) >= 500:
+            OrderItem.objects.bulk_update(batch, SNAPSHOT_FIELDS)
+            batch = []
+    if batch:
+        OrderItem.objects.bulk_update(batch, SNAPSHOT_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0010_merge_20260313_1640'),
+        # The backfill reads Product.category as a foreign key
+        ('products', '0008_stock_shards'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='category_slug',
+            field=models.SlugField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='original_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='product_brand',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='product_image',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='product_name',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='product_slug',
+            field=models.SlugField(blank=True, default='', max_length=255),
+        ),
+        migrations.RunPython(backfill_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:37
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0014_order_admin_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('order_number', models.CharField(editable=False, max_length=20, unique=True)),
+                ('email', models.EmailField(blank=True, default='', max_length=254)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('shipping_name', models.CharField(blank=True, max_length=255)),
+                ('shipping_address', models.TextField(blank=True)),
+                ('phone', models.CharField(blank=True, max_length=20)),
+                ('delivery_area', models.CharField(blank=True, choices=[('inside', 'Inside Dhaka City'), ('outside', 'Outside Dhaka City')], max_length=50)),
+                ('district', models.CharField(blank=True, default='', max_length=100)),
+                ('tracking_number', models.CharField(blank=True, max_length=100)),
+                ('tracking_document', models.JSONField(blank=True, default=dict, editable=False)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_orders', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_id', models.UUIDField()),
+                ('quantity', models.PositiveIntegerField()),
+                ('size', models.CharField(blank=True, max_length=20)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('product_name', models.CharField(blank=True, default='', max_length=255)),
+                ('product_brand', models.CharField(blank=True, default='', max_length=100)),
+                ('product_slug', models.SlugField(blank=True, default='', max_length=255)),
+                ('product_image', models.CharField(blank=True, default='', max_length=255)),
+                ('category_slug', models.SlugField(blank=True, default='', max_length=100)),
+                ('original_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='orders.archivedorder')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['user', '-created_at'], name='orders_arch_user_id_6febd8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['-created_at'], name='orders_arch_created_892a6d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['status', '-created_at'], name='orders_arch_status_af5a97_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:48
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def seed_rates(apps, schema_editor):
+    ShippingRate = apps.get_model('orders', 'ShippingRate')
+    for area, amount in (('inside', Decimal('60.00')), ('outside', Decimal('150.00'))):
+        ShippingRate.objects.get_or_create(delivery_area=area, defaults={'amount': amount})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0015_order_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShippingRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delivery_area', models.CharField(choices=[('inside', 'Inside Dhaka City'), ('outside', 'Outside Dhaka City')], max_length=50, unique=True)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['delivery_area'],
+            },
+        ),
+        migrations.RunPython(seed_rates, migrations.RunPython.noop),
+    ]
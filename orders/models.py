@@ -51,24 +51,151 @@ class Order(models.Model):
     )
     district = models.CharField(max_length=100, blank=True, default='')
     tracking_number = models.CharField(max_length=100, blank=True)
+    # Pre-rendered customer-facing JSON for the track-order page
+    tracking_document = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['district', '-created_at']),
+            models.Index(fields=['delivery_area', '-created_at']),
+            models.Index(fields=['phone']),
+        ]
 
     def __str__(self):
         display_id = self.order_number or str(self.id)[:8]
         return f"Order {display_id}"
 
 
+def with_items_count(qs):
+    """Annotate an Order queryset with items_count for list serializers."""
+    # Meta.ordering is not applied to aggregate queries, so order explicitly.
+    return qs.defer('tracking_document').annotate(
+        items_count=models.Count('items'),
+    ).order_by('-created_at')
+
+
 class OrderItem(models.Model):
-    """Line item in an order with price snapshot."""
+    """Line item in an order with price and product snapshot."""
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
     product = models.ForeignKey(Product, on_delete=models.PROTECT)
     quantity = models.PositiveIntegerField()
     size = models.CharField(max_length=20, blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
+    # Snapshot of the product at purchase time; orders render from these
+    # fields so they neither join Product nor change when it is edited.
+    product_name = models.CharField(max_length=255, blank=True, default='')
+    product_brand = models.CharField(max_length=100, blank=True, default='')
+    product_slug = models.SlugField(max_length=255, blank=True, default='')
+    product_image = models.CharField(max_length=255, blank=True, default='')
+    category_slug = models.SlugField(max_length=100, blank=True, default='')
+    original_price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
 
     def __str__(self):
-        return f"{self.order} - {self.product.name} x{self.quantity}"
+        return f"{self.order} - {self.product_name or self.product_id} x{self.quantity}"
+
+    @staticmethod
+    def snapshot_fields(product) -> dict:
+        """Snapshot field values for a product (expects category to be loaded)."""
+        return {
+            'product_name': product.name,
+            'product_brand': product.brand,
+            'product_slug': product.slug,
+            'product_image': product.image.name if product.image else '',
+            'category_slug': product.category_slug or '',
+            'original_price': product.original_price,
+        }
+
+
+class ArchivedOrder(models.Model):
+    """
+    Cold copy of an Order moved out of the hot table by archive_orders.
+
+    Mirrors Order's columns so the order serializers and admin list
+    serializer can render it unchanged; see orders.archive for routing.
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+    order_number = models.CharField(max_length=20, unique=True, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='archived_orders'
+    )
+    email = models.EmailField(blank=True, default='')
+    status = models.CharField(max_length=20, choices=Order.Status.choices)
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    shipping_name = models.CharField(max_length=255, blank=True)
+    shipping_address = models.TextField(blank=True)
+    phone = models.CharField(max_length=20, blank=True)
+    delivery_area = models.CharField(
+        max_length=50, choices=Order.DeliveryArea.choices, blank=True,
+    )
+    district = models.CharField(max_length=100, blank=True, default='')
+    tracking_number = models.CharField(max_length=100, blank=True)
+    tracking_document = models.JSONField(default=dict, blank=True, editable=False)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['status', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"Archived order {self.order_number}"
+
+
+class ArchivedOrderItem(models.Model):
+    """Line item of an ArchivedOrder; keeps the product id without a foreign key."""
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name='items')
+    product_id = models.UUIDField()
+    quantity = models.PositiveIntegerField()
+    size = models.CharField(max_length=20, blank=True)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    product_name = models.CharField(max_length=255, blank=True, default='')
+    product_brand = models.CharField(max_length=100, blank=True, default='')
+    product_slug = models.SlugField(max_length=255, blank=True, default='')
+    product_image = models.CharField(max_length=255, blank=True, default='')
+    category_slug = models.SlugField(max_length=100, blank=True, default='')
+    original_price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
+
+    def __str__(self):
+        return f"{self.order} - {self.product_name or self.product_id} x{self.quantity}"
+
+
+class ShippingRate(models.Model):
+    """Flat shipping charge per delivery area; read through orders.shipping (cached when the cache is shared)."""
+    delivery_area = models.CharField(
+        max_length=50, choices=Order.DeliveryArea.choices, unique=True,
+    )
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['delivery_area']
+
+    def __str__(self):
+        return f"{self.get_delivery_area_display()}: {self.amount}"
+
+    def save(self, *args, **kwargs):
+        from .shipping import clear_shipping_rates_cache
+        super().save(*args, **kwargs)
+        clear_shipping_rates_cache()
+
+    def delete(self, *args, **kwargs):
+        from .shipping import clear_shipping_rates_cache
+        result = super().delete(*args, **kwargs)
+        clear_shipping_rates_cache()
+        return result
@@ -1,17 +1,36 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 
-from products.serializers import ProductListSerializer
-
 from .models import Order, OrderItem
 
 
+def _storage_url(path, request):
+    if not path:
+        return None
+    url = default_storage.url(path)
+    return request.build_absolute_uri(url) if request else url
+
+
 class OrderItemSerializer(serializers.ModelSerializer):
-    product = ProductListSerializer(read_only=True)
+    """Renders the product card from the purchase-time snapshot, not Product."""
+    product = serializers.SerializerMethodField()
 
     class Meta:
         model = OrderItem
         fields = ['id', 'product', 'quantity', 'size', 'price']
 
+    def get_product(self, obj):
+        return {
+            'id': str(obj.product_id),
+            'name': obj.product_name,
+            'brand': obj.product_brand,
+            'slug': obj.product_slug,
+            'price': str(obj.price),
+            'originalPrice': str(obj.original_price) if obj.original_price is not None else None,
+            'image': _storage_url(obj.product_image, self.context.get('request')),
+            'category': obj.category_slug or None,
+        }
+
 
 class OrderSerializer(serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
@@ -32,6 +51,19 @@ class OrderSerializer(serializers.ModelSerializer):
         return data
 
 
+class OrderSummarySerializer(serializers.Serializer):
+    """Compact order history row built from an annotated values() query."""
+    id = serializers.CharField(source='order_number')
+    status = serializers.CharField()
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    item_count = serializers.IntegerField()
+    thumbnail = serializers.SerializerMethodField()
+    created_at = serializers.DateTimeField()
+
+    def get_thumbnail(self, obj):
+        return _storage_url(obj['thumbnail'], self.context.get('request'))
+
+
 class OrderCreateSerializer(serializers.Serializer):
     email = serializers.EmailField()
     shipping_name = serializers.CharField(max_length=255)
@@ -0,0 +1,56 @@
+"""
+Shipping rates per delivery area, cached so checkout and cart reads skip the table.
+
+The cache is only used when the default backend is shared between
+processes (Redis, with REDIS_URL set), so a rate change invalidated by one
+worker is seen by all of them. Without REDIS_URL the default backend is
+LocMemCache, which is per process: there the rates are read from the
+(two-row) table every time instead, since a stale per-process copy would
+keep charging the old rate at checkout.
+"""
+from decimal import Decimal
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from .models import Order, ShippingRate
+
+# Used when an area has no ShippingRate row.
+DEFAULT_SHIPPING_RATES = {
+    Order.DeliveryArea.INSIDE: Decimal('60.00'),
+    Order.DeliveryArea.OUTSIDE: Decimal('150.00'),
+}
+CACHE_KEY = 'orders:shipping_rates'
+CACHE_TIMEOUT = 300
+
+
+def _cache_is_shared() -> bool:
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def _load_rates() -> dict[str, Decimal]:
+    rates = {str(area): amount for area, amount in DEFAULT_SHIPPING_RATES.items()}
+    rates.update(ShippingRate.objects.values_list('delivery_area', 'amount'))
+    return rates
+
+
+def shipping_rates() -> dict[str, Decimal]:
+    """{delivery_area: amount} for every delivery area."""
+    if not _cache_is_shared():
+        return _load_rates()
+    rates = cache.get(CACHE_KEY)
+    if rates is None:
+        rates = _load_rates()
+        cache.set(CACHE_KEY, rates, CACHE_TIMEOUT)
+    return rates
+
+
+def shipping_rate(delivery_area: str) -> Decimal:
+    rates = shipping_rates()
+    return rates.get(delivery_area, rates[Order.DeliveryArea.OUTSIDE])
+
+
+def clear_shipping_rates_cache() -> None:
+    if _cache_is_shared():
+        cache.delete(CACHE_KEY)
@@ -0,0 +1,23 @@
+"""
+Pre-rendered order tracking documents.
+
+The track-order page is public and refreshed often, so OrderDetailView
+serves Order.tracking_document instead of serializing the order and its
+items on every request. The document is rendered at checkout and rewritten
+whenever staff change the order.
+"""
+from .models import Order
+from .serializers import OrderSerializer
+
+
+def render_tracking_document(order: Order) -> dict:
+    """Render the customer-facing representation of a fully loaded order."""
+    return OrderSerializer(instance=order).data
+
+
+def refresh_tracking_document(order: Order) -> dict:
+    """Re-render and store the tracking document of order."""
+    document = render_tracking_document(order)
+    Order.objects.filter(pk=order.pk).update(tracking_document=document)
+    order.tracking_document = document
+    return document
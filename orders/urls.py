@@ -7,5 +7,6 @@ urlpatterns = [
     path('direct/', views.DirectOrderCreateView.as_view(), name='order-create-direct'),
     path('initiate-checkout/', views.InitiateCheckoutView.as_view(), name='order-initiate-checkout'),
     path('my/', views.OrderListView.as_view(), name='order-list'),
+    path('my/summary/', views.OrderSummaryListView.as_view(), name='order-summary-list'),
     path('<str:id>/', views.OrderDetailView.as_view(), name='order-detail'),
 ]
@@ -1,18 +1,29 @@
 from decimal import Decimal
 
 from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
 from rest_framework import status
 from rest_framework.exceptions import NotFound
 from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveAPIView
+from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from cart.views import get_or_create_cart
+from cart.views import get_cart
 from meta_pixel.service import meta_conversions
+from products.inventory import lock_for_checkout, reserve_stock
 
-from .models import Order, OrderItem
-from .serializers import OrderCreateSerializer, OrderSerializer, DirectOrderCreateSerializer
+from .archive import routed_orders
+from .models import ArchivedOrder, Order, OrderItem
+from .serializers import (
+    DirectOrderCreateSerializer,
+    OrderCreateSerializer,
+    OrderSerializer,
+    OrderSummarySerializer,
+)
+from .shipping import shipping_rate
+from .tracking import refresh_tracking_document
 from .utils import get_next_order_number
 
 
@@ -24,8 +35,8 @@ class OrderCreateView(CreateAPIView):
     def create(self, request, *args, **kwargs):
         ser = self.get_serializer(data=request.data)
         ser.is_valid(raise_exception=True)
-        cart = get_or_create_cart(request)
-        items = list(cart.items.select_related('product'))
+        cart = get_cart(request)
+        items = list(cart.items.select_related('product')) if cart else []
         if not items:
             return Response(
                 {'detail': 'Cart is empty.'},
@@ -33,13 +44,8 @@ class OrderCreateView(CreateAPIView):
             )
         
         # Get products with locked rows for atomic stock updates
-        from products.models import Product
         product_ids = [ci.product_id for ci in items]
-        locked_products = {
-            p.id: p for p in Product.objects.filter(
-                id__in=product_ids
-            ).select_for_update()
-        }
+        locked_products = lock_for_checkout(product_ids)
         
         # Check stock availability
         stock_errors = []
@@ -48,13 +54,22 @@ class OrderCreateView(CreateAPIView):
             if not product:
                 stock_errors.append(f"Product {ci.product.name} not found.")
                 continue
-            if product.stock < ci.quantity:
+            if not product.stock_sharded and product.stock < ci.quantity:
                 stock_errors.append(
                     f"Insufficient stock for {product.name}. "
                     f"Available: {product.stock}, Requested: {ci.quantity}"
                 )
+        # Sharded products take their stock from a random shard instead.
+        if not stock_errors:
+            for ci in items:
+                product = locked_products[ci.product_id]
+                if product.stock_sharded and not reserve_stock(product.id, ci.quantity):
+                    stock_errors.append(
+                        f"Insufficient stock for {product.name}. Requested: {ci.quantity}"
+                    )
         
         if stock_errors:
+            transaction.set_rollback(True)
             return Response(
                 {'detail': 'Stock validation failed.', 'errors': stock_errors},
                 status=status.HTTP_400_BAD_REQUEST
@@ -74,22 +89,22 @@ class OrderCreateView(CreateAPIView):
             price = product.price
             OrderItem.objects.create(
                 order=order, product=product, quantity=ci.quantity,
-                size=ci.size or '', price=price
+                size=ci.size or '', price=price,
+                **OrderItem.snapshot_fields(product)
             )
             # Reduce stock atomically
-            product.stock -= ci.quantity
-            product.save(update_fields=['stock'])
+            if not product.stock_sharded:
+                product.stock -= ci.quantity
+                product.save(update_fields=['stock'])
             total += price * ci.quantity
         order.total = total
         order.save(update_fields=['total'])
         cart.items.all().delete()
+        document = refresh_tracking_document(order)
 
         meta_conversions.track_purchase(request, order)
 
-        return Response(
-            OrderSerializer(instance=order, context={'request': request}).data,
-            status=status.HTTP_201_CREATED
-        )
+        return Response(document, status=status.HTTP_201_CREATED)
 
 
 class DirectOrderCreateView(CreateAPIView):
@@ -111,7 +126,6 @@ class DirectOrderCreateView(CreateAPIView):
             )
         
         # Get products with locked rows for atomic stock updates
-        from products.models import Product
         import uuid as uuid_lib
         product_ids = []
         validation_errors = []
@@ -128,9 +142,7 @@ class DirectOrderCreateView(CreateAPIView):
             )
         
         locked_products = {
-            str(p.id): p for p in Product.objects.filter(
-                id__in=product_ids
-            ).select_for_update()
+            str(pk): p for pk, p in lock_for_checkout(product_ids).items()
         }
         
         # Check stock availability
@@ -142,13 +154,23 @@ class DirectOrderCreateView(CreateAPIView):
             if not product:
                 stock_errors.append(f"Product {product_id_str} not found.")
                 continue
-            if product.stock < quantity:
+            if not product.stock_sharded and product.stock < quantity:
                 stock_errors.append(
                     f"Insufficient stock for {product.name}. "
                     f"Available: {product.stock}, Requested: {quantity}"
                 )
+        # Sharded products take their stock from a random shard instead.
+        if not stock_errors:
+            for product_data in products_data:
+                product = locked_products[str(product_data['id'])]
+                quantity = product_data['quantity']
+                if product.stock_sharded and not reserve_stock(product.id, quantity):
+                    stock_errors.append(
+                        f"Insufficient stock for {product.name}. Requested: {quantity}"
+                    )
         
         if stock_errors:
+            transaction.set_rollback(True)
             return Response(
                 {'detail': 'Stock validation failed.', 'errors': stock_errors},
                 status=status.HTTP_400_BAD_REQUEST
@@ -166,7 +188,7 @@ class DirectOrderCreateView(CreateAPIView):
         else:
             delivery_area = ser.validated_data['delivery_area']
 
-        shipping_cost = Decimal('60.00') if delivery_area == 'inside' else Decimal('150.00')
+        shipping_cost = shipping_rate(delivery_area)
 
         # Create order and reduce stock
         total = Decimal('0.00')
@@ -188,17 +210,20 @@ class DirectOrderCreateView(CreateAPIView):
             price = product.price
             OrderItem.objects.create(
                 order=order, product=product, quantity=quantity,
-                size='', price=price
+                size='', price=price,
+                **OrderItem.snapshot_fields(product)
             )
             # Reduce stock atomically
-            product.stock -= quantity
-            product.save(update_fields=['stock'])
+            if not product.stock_sharded:
+                product.stock -= quantity
+                product.save(update_fields=['stock'])
             total += price * quantity
         
         # Add shipping cost
         total += shipping_cost
         order.total = total
         order.save(update_fields=['total'])
+        document = refresh_tracking_document(order)
 
         meta_conversions.track_add_payment_info(request, {
             'email': order.email,
@@ -207,33 +232,93 @@ class DirectOrderCreateView(CreateAPIView):
         })
         meta_conversions.track_purchase(request, order)
 
-        return Response(
-            OrderSerializer(instance=order, context={'request': request}).data,
-            status=status.HTTP_201_CREATED
-        )
+        return Response(document, status=status.HTTP_201_CREATED)
 
 
 class OrderListView(ListAPIView):
-    """List orders for the authenticated user."""
+    """
+    List orders for the authenticated user, archived ones included
+    (?archived=true / ?archived=false for one side only).
+    """
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     def get_queryset(self):
         if not self.request.user.is_authenticated:
             return Order.objects.none()
-        return Order.objects.filter(user=self.request.user).prefetch_related(
-            'items__product', 'items__product__images'
+        return routed_orders(
+            self.request.query_params,
+            lambda order_model, _: order_model.objects.filter(
+                user=self.request.user,
+            ).prefetch_related('items').order_by('-created_at'),
+        )
+
+
+class OrderHistoryPagination(CursorPagination):
+    ordering = '-created_at'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class OrderSummaryListView(ListAPIView):
+    """
+    Lightweight order history for the authenticated user.
+
+    One annotated query per page (no items or products are loaded), walked
+    with cursor pagination over the (user, created_at) index. Full orders
+    are fetched on demand from OrderDetailView. Archived orders follow the
+    hot ones; ?archived=true / ?archived=false page through one side only.
+    """
+    serializer_class = OrderSummarySerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = OrderHistoryPagination
+
+    def get_queryset(self):
+        if not self.request.user.is_authenticated:
+            return Order.objects.none()
+        return routed_orders(self.request.query_params, self._summaries)
+
+    def _summaries(self, order_model, item_model):
+        first_image = item_model.objects.filter(
+            order=OuterRef('pk'),
+        ).order_by('pk').values('product_image')[:1]
+        return order_model.objects.filter(user=self.request.user).values(
+            'order_number', 'status', 'total', 'created_at',
+        ).annotate(
+            item_count=Count('items'),
+            thumbnail=Subquery(first_image),
         )
 
 
 class OrderDetailView(RetrieveAPIView):
-    """Get order by id (for track-order). Allow by id + email for guests."""
+    """
+    Get order by id (for track-order). Allow by id + email for guests.
+
+    Serves the pre-rendered tracking document with a single lookup on the
+    order_number index; orders created before documents existed are
+    rendered once and stored on first access. Order numbers not found in
+    the hot table are looked up in the archive.
+    """
     serializer_class = OrderSerializer
-    queryset = Order.objects.prefetch_related('items__product', 'items__product__images')
+    queryset = Order.objects.only('id', 'order_number', 'user_id', 'email', 'tracking_document')
+
+    def retrieve(self, request, *args, **kwargs):
+        order = self.get_object()
+        document = order.tracking_document
+        if not document and isinstance(order, Order):
+            document = refresh_tracking_document(
+                Order.objects.prefetch_related('items').get(pk=order.pk)
+            )
+        return Response(document)
 
     def get_object(self):
         order_id = self.kwargs.get('id')
         order = self.get_queryset().filter(order_number=order_id).first()
+        if not order:
+            order = ArchivedOrder.objects.only(
+                'id', 'order_number', 'user_id', 'email', 'tracking_document',
+            ).filter(order_number=order_id).first()
         if not order:
             raise NotFound()
         if order.user_id and (not self.request.user.is_authenticated or order.user_id != self.request.user.id):
@@ -1,7 +1,8 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django import forms
 from django.utils.html import mark_safe
 
+from .inventory import adjust_sharded_stock, disable_sharding, enable_sharding
 from .models import Brand, Category, NavbarCategory, Product, ProductImage
 
 
@@ -25,13 +26,15 @@ class ProductAdminForm(forms.ModelForm):
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
     form = ProductAdminForm
-    list_display = ['name', 'brand', 'get_category', 'get_sub_category', 'price', 'stock', 'badge', 'is_featured', 'is_active']
+    list_display = ['name', 'brand', 'get_category', 'get_sub_category', 'price', 'stock', 'stock_sharded', 'badge', 'is_featured', 'is_active']
     list_editable = ['stock', 'is_active']
-    list_filter = ['category', 'sub_category', 'badge', 'is_featured', 'is_active']
+    list_filter = ['category', 'sub_category', 'badge', 'is_featured', 'is_active', 'stock_sharded']
     search_fields = ['name', 'brand']
     prepopulated_fields = {'slug': ('name',)}
     inlines = [ProductImageInline]
     autocomplete_fields = ['category', 'sub_category']
+    readonly_fields = ['stock_sharded']
+    actions = ['enable_stock_sharding', 'disable_stock_sharding']
     fieldsets = (
         (None, {
             'fields': ('name', 'brand', 'slug', 'category', 'sub_category')
@@ -43,10 +46,28 @@ class ProductAdmin(admin.ModelAdmin):
             'fields': ('image',)
         }),
         ('Additional Information', {
-            'fields': ('description', 'stock', 'is_featured', 'is_active')
+            'fields': ('description', 'stock', 'stock_sharded', 'is_featured', 'is_active')
         }),
     )
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and obj.stock_sharded and 'stock' in form.changed_data:
+            # Apply the edit as a difference so stock sold since the form loaded stays sold
+            obj.stock = adjust_sharded_stock(obj, obj.stock - (form.initial.get('stock') or 0))
+
+    @admin.action(description='Enable sharded stock for selected products')
+    def enable_stock_sharding(self, request, queryset):
+        for product in queryset.filter(stock_sharded=False):
+            enable_sharding(product)
+        messages.success(request, 'Sharded stock enabled.')
+
+    @admin.action(description='Disable sharded stock for selected products')
+    def disable_stock_sharding(self, request, queryset):
+        for product in queryset.filter(stock_sharded=True):
+            disable_sharding(product)
+        messages.success(request, 'Sharded stock disabled.')
+
     def formfield_for_dbfield(self, db_field, request, **kwargs):
         field = super().formfield_for_dbfield(db_field, request, **kwargs)
         if db_field.name == 'stock' and field:
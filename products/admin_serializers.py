@@ -22,7 +22,7 @@ class AdminProductListSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'brand', 'slug', 'price', 'original_price',
             'image_url', 'badge', 'category', 'category_name',
-            'sub_category', 'sub_category_name', 'stock',
+            'sub_category', 'sub_category_name', 'stock', 'stock_sharded',
             'is_featured', 'is_active', 'created_at',
         ]
 
@@ -45,10 +45,15 @@ class AdminProductSerializer(serializers.ModelSerializer):
             'id', 'name', 'brand', 'slug', 'price', 'original_price',
             'image', 'badge', 'category', 'category_name',
             'sub_category', 'sub_category_name', 'description',
-            'stock', 'is_featured', 'is_active', 'images',
+            'stock', 'stock_sharded', 'is_featured', 'is_active', 'images',
             'created_at', 'updated_at',
         ]
-        read_only_fields = ['id', 'slug', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'slug', 'stock_sharded', 'created_at', 'updated_at']
+
+
+class AdminStockShardingSerializer(serializers.Serializer):
+    enabled = serializers.BooleanField()
+    shards = serializers.IntegerField(min_value=1, max_value=64, required=False)
 
 
 class AdminNavbarCategorySerializer(serializers.ModelSerializer):
@@ -6,7 +6,9 @@ from rest_framework.response import Response
 
 from config.permissions import IsStaffUser
 from core.activity import log_activity
+from core.export import ExportMixin
 from core.models import ActivityLog
+from .inventory import adjust_sharded_stock, disable_sharding, enable_sharding
 from .models import Brand, Category, NavbarCategory, Product, ProductImage
 from .admin_serializers import (
     AdminBrandSerializer,
@@ -15,16 +17,33 @@ from .admin_serializers import (
     AdminProductImageSerializer,
     AdminProductListSerializer,
     AdminProductSerializer,
+    AdminStockShardingSerializer,
 )
 
 
-class AdminProductViewSet(viewsets.ModelViewSet):
+class AdminProductViewSet(ExportMixin, viewsets.ModelViewSet):
     permission_classes = [IsStaffUser]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
     queryset = Product.objects.select_related(
         'category', 'sub_category',
     ).prefetch_related('images').all()
     lookup_field = 'pk'
+    export_filename = 'products'
+    export_fields = {
+        'id': 'id',
+        'name': 'name',
+        'brand': 'brand',
+        'slug': 'slug',
+        'price': 'price',
+        'original_price': 'original_price',
+        'stock': 'stock',
+        'category': 'category__slug',
+        'sub_category': 'sub_category__slug',
+        'badge': 'badge',
+        'is_featured': 'is_featured',
+        'is_active': 'is_active',
+        'created_at': 'created_at',
+    }
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -42,7 +61,11 @@ class AdminProductViewSet(viewsets.ModelViewSet):
         )
 
     def perform_update(self, serializer):
+        # Stock shown to the admin; shards may have moved since via checkouts
+        previous_stock = serializer.instance.stock
         instance = serializer.save()
+        if instance.stock_sharded and instance.stock != previous_stock:
+            instance.stock = adjust_sharded_stock(instance, instance.stock - previous_stock)
         log_activity(
             request=self.request,
             action=ActivityLog.Action.UPDATE,
@@ -75,6 +98,28 @@ class AdminProductViewSet(viewsets.ModelViewSet):
         exists = Product.objects.filter(slug=normalized).exists()
         return Response({'available': not exists})
 
+    @action(detail=True, methods=['post'], url_path='stock-sharding')
+    def stock_sharding(self, request, pk=None):
+        """Switch a product in or out of sharded stock mode."""
+        product = self.get_object()
+        serializer = AdminStockShardingSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        enabled = serializer.validated_data['enabled']
+        if enabled != product.stock_sharded:
+            if enabled:
+                product = enable_sharding(product, serializer.validated_data.get('shards'))
+            else:
+                product = disable_sharding(product)
+            log_activity(
+                request=request,
+                action=ActivityLog.Action.UPDATE,
+                entity_type="product",
+                entity_id=product.pk,
+                summary=f"Product stock sharding {'enabled' if enabled else 'disabled'}: {product.name}",
+            )
+        product.refresh_from_db()
+        return Response(AdminProductSerializer(product, context={'request': request}).data)
+
 
 class AdminProductImageViewSet(viewsets.ModelViewSet):
     permission_classes = [IsStaffUser]
@@ -0,0 +1,117 @@
+"""
+Request-scoped identity map for Product and category lookups.
+
+ProductIdentityMapMiddleware installs a fresh map for every request;
+get_product() and the category helpers then load each row at most once
+per request, so validators, views and services that look up the same
+product share one instance instead of re-querying. Outside a request
+(management commands, background threads) the helpers simply query.
+
+Not for writes: checkout locks products with select_for_update via
+products.inventory and must not use cached instances.
+"""
+import uuid
+from contextvars import ContextVar
+
+from .models import Category, NavbarCategory, Product
+
+_MISSING = object()
+_current = ContextVar('product_identity_map', default=None)
+
+
+class IdentityMap:
+    def __init__(self):
+        self.products = {}       # product id -> Product or _MISSING
+        self.product_slugs = {}  # slug -> product id or _MISSING
+        self.categories = {}     # (model, slug) -> instance or _MISSING
+
+    def remember(self, product):
+        self.products[product.pk] = product
+        self.product_slugs[product.slug] = product.pk
+        for field, model in (('category', NavbarCategory), ('sub_category', Category)):
+            if field in product._state.fields_cache:
+                related = product._state.fields_cache[field]
+                if related is not None:
+                    self.categories[(model, related.slug)] = related
+        return product
+
+
+def _parse_uuid(value):
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def get_product(identifier, *, active_only=True):
+    """Product by UUID or slug with category and sub_category loaded, or None."""
+    identity_map = _current.get()
+    pk = _parse_uuid(identifier)
+    product = _MISSING
+    if identity_map is not None:
+        if pk is not None:
+            product = identity_map.products.get(pk, _MISSING)
+        else:
+            cached_pk = identity_map.product_slugs.get(identifier, _MISSING)
+            if cached_pk is None:
+                product = None
+            elif cached_pk is not _MISSING:
+                product = identity_map.products.get(cached_pk, _MISSING)
+
+    if product is _MISSING:
+        lookup = {'pk': pk} if pk is not None else {'slug': identifier}
+        product = Product.objects.select_related('category', 'sub_category').filter(**lookup).first()
+        if identity_map is not None:
+            if product is not None:
+                identity_map.remember(product)
+            elif pk is not None:
+                identity_map.products[pk] = None
+            else:
+                identity_map.product_slugs[identifier] = None
+
+    if product is None or (active_only and not product.is_active):
+        return None
+    return product
+
+
+def _get_category(model, slug, active_only):
+    identity_map = _current.get()
+    instance = _MISSING
+    if identity_map is not None:
+        instance = identity_map.categories.get((model, slug), _MISSING)
+    if instance is _MISSING:
+        qs = model.objects.filter(slug=slug)
+        if model is Category:
+            qs = qs.select_related('navbar_category')
+        instance = qs.first()
+        if identity_map is not None:
+            identity_map.categories[(model, slug)] = instance
+    if instance is None or (active_only and not instance.is_active):
+        return None
+    return instance
+
+
+def get_navbar_category(slug, *, active_only=True):
+    """Navbar category by slug, or None."""
+    return _get_category(NavbarCategory, slug, active_only)
+
+
+def get_category(slug, *, active_only=True):
+    """Subcategory by slug with its navbar category loaded, or None."""
+    return _get_category(Category, slug, active_only)
+
+
+class ProductIdentityMapMiddleware:
+    """Give each request its own identity map."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _current.set(IdentityMap())
+        try:
+            return self.get_response(request)
+        finally:
+            _current.reset(token)
@@ -0,0 +1,242 @@
+"""
+Sharded stock counters for hot products.
+
+A product in sharded mode keeps its sellable quantity in StockShard rows
+instead of the single Product.stock column, so concurrent checkouts of the
+same SKU update different rows. Product.stock is then an eventually
+consistent sum used for list display, refreshed by the
+rebalance_stock_shards management command (rebalance_shards(), or
+sync_product_stock() with --sync-only). Reads that must be exact (product
+detail, cart stock warnings, the batch endpoint) use available_stock() /
+live_stock() instead.
+"""
+import random
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from core import counters
+
+from .models import Product, StockShard
+
+
+def default_shard_count() -> int:
+    return max(1, int(getattr(settings, 'STOCK_SHARD_COUNT', 8)))
+
+
+def _split(total: int, shards: int) -> list[int]:
+    """Spread total as evenly as possible over the given number of shards."""
+    base, extra = divmod(total, shards)
+    return [base + (1 if i < extra else 0) for i in range(shards)]
+
+
+def _write_shards(product_id, total: int, shards: int) -> None:
+    StockShard.objects.filter(product_id=product_id).delete()
+    StockShard.objects.bulk_create([
+        StockShard(product_id=product_id, index=i, quantity=qty)
+        for i, qty in enumerate(_split(total, shards))
+    ])
+
+
+def _store_stock(product_id, stock: int, **fields) -> None:
+    """
+    Write Product.stock with update() and move the dashboard's out-of-stock
+    counter, which the post_save receivers never see for update().
+    """
+    before = Product.objects.filter(pk=product_id).values_list('is_active', 'stock').first()
+    if before is None:
+        return
+    Product.objects.filter(pk=product_id).update(stock=stock, **fields)
+    counters.adjust(counters.product_deltas(before, (before[0], stock)))
+
+
+def lock_for_checkout(product_ids) -> dict:
+    """
+    Load products for checkout keyed by id.
+
+    Only non-sharded products are row-locked; sharded products are read
+    without a lock and their stock is taken with reserve_stock().
+    """
+    products = {
+        p.id: p for p in Product.objects.filter(
+            id__in=product_ids, stock_sharded=False,
+        ).select_related('category').select_for_update(of=('self',))
+    }
+    products.update(
+        (p.id, p) for p in Product.objects.filter(
+            id__in=product_ids, stock_sharded=True,
+        ).select_related('category')
+    )
+    return products
+
+
+def reserve_stock(product_id, quantity: int) -> bool:
+    """
+    Take quantity from the shards of a sharded product.
+
+    Must run inside the checkout transaction so a later failure rolls the
+    decrement back. Returns False when the shards cannot cover the request.
+    """
+    candidates = list(
+        StockShard.objects.filter(
+            product_id=product_id, quantity__gte=quantity,
+        ).values_list('pk', flat=True)
+    )
+    random.shuffle(candidates)
+    for pk in candidates:
+        updated = StockShard.objects.filter(
+            pk=pk, quantity__gte=quantity,
+        ).update(quantity=F('quantity') - quantity)
+        if updated:
+            return True
+
+    # No single shard can cover the request: drain several under lock.
+    shards = list(
+        StockShard.objects.select_for_update().filter(
+            product_id=product_id, quantity__gt=0,
+        ).order_by('index')
+    )
+    if sum(s.quantity for s in shards) < quantity:
+        return False
+    remaining = quantity
+    touched = []
+    for shard in shards:
+        take = min(shard.quantity, remaining)
+        shard.quantity -= take
+        remaining -= take
+        touched.append(shard)
+        if not remaining:
+            break
+    StockShard.objects.bulk_update(touched, ['quantity'])
+    return True
+
+
+def available_stock(product_id) -> int:
+    total = StockShard.objects.filter(product_id=product_id).aggregate(
+        total=Sum('quantity'),
+    )['total']
+    return total or 0
+
+
+def live_stock(product_ids) -> dict:
+    """Current shard totals keyed by product id, in one grouped query."""
+    return dict(
+        StockShard.objects.filter(product_id__in=product_ids)
+        .values('product_id')
+        .annotate(total=Sum('quantity'))
+        .order_by()
+        .values_list('product_id', 'total')
+    )
+
+
+def sync_product_stock(product_ids=None) -> int:
+    """Copy the shard sums into Product.stock for sharded products."""
+    shard_total = (
+        StockShard.objects.filter(product=OuterRef('pk'))
+        .values('product')
+        .annotate(total=Sum('quantity'))
+        .values('total')
+    )
+    qs = Product.objects.filter(stock_sharded=True)
+    if product_ids is not None:
+        qs = qs.filter(id__in=product_ids)
+    with transaction.atomic():
+        before = {pk: (active, stock) for pk, active, stock in qs.values_list('pk', 'is_active', 'stock')}
+        updated = qs.update(stock=Coalesce(Subquery(shard_total), 0))
+        deltas = {}
+        after = Product.objects.filter(pk__in=before).values_list('pk', 'is_active', 'stock')
+        for pk, active, stock in after:
+            for key, delta in counters.product_deltas(before[pk], (active, stock)).items():
+                deltas[key] = deltas.get(key, 0) + delta
+        counters.adjust(deltas)
+    return updated
+
+
+@transaction.atomic
+def enable_sharding(product: Product, shards: int | None = None) -> Product:
+    """Move product.stock into shards and switch the product to sharded mode."""
+    product = Product.objects.select_for_update().get(pk=product.pk)
+    if product.stock_sharded:
+        return product
+    _write_shards(product.pk, product.stock, shards or default_shard_count())
+    Product.objects.filter(pk=product.pk).update(stock_sharded=True)
+    product.stock_sharded = True
+    return product
+
+
+@transaction.atomic
+def disable_sharding(product: Product) -> Product:
+    """Fold the shards back into product.stock and leave sharded mode."""
+    product = Product.objects.select_for_update().get(pk=product.pk)
+    if not product.stock_sharded:
+        return product
+    shards = list(StockShard.objects.select_for_update().filter(product=product))
+    product.stock = sum(s.quantity for s in shards)
+    product.stock_sharded = False
+    StockShard.objects.filter(product=product).delete()
+    _store_stock(product.pk, product.stock, stock_sharded=False)
+    return product
+
+
+@transaction.atomic
+def set_sharded_stock(product: Product, quantity: int) -> None:
+    """Replace the stock of a sharded product, e.g. after an admin edit."""
+    shards = list(StockShard.objects.select_for_update().filter(product=product))
+    _write_shards(product.pk, quantity, len(shards) or default_shard_count())
+    _store_stock(product.pk, quantity)
+
+
+@transaction.atomic
+def adjust_sharded_stock(product: Product, delta: int) -> int:
+    """
+    Add delta (negative to remove) to the shards of a sharded product.
+
+    Used for admin edits instead of set_sharded_stock(): stock taken from
+    the shards by checkouts since the form was loaded stays taken. Returns
+    the new total, which is also written to product.stock.
+    """
+    shards = list(
+        StockShard.objects.select_for_update().filter(product=product).order_by('index')
+    )
+    if not shards:
+        total = max(0, delta)
+        _write_shards(product.pk, total, default_shard_count())
+    else:
+        if delta > 0:
+            for shard, extra in zip(shards, _split(delta, len(shards))):
+                shard.quantity += extra
+        else:
+            remaining = -delta
+            for shard in sorted(shards, key=lambda s: -s.quantity):
+                take = min(shard.quantity, remaining)
+                shard.quantity -= take
+                remaining -= take
+                if not remaining:
+                    break
+        StockShard.objects.bulk_update(shards, ['quantity'])
+        total = sum(s.quantity for s in shards)
+    _store_stock(product.pk, total)
+    return total
+
+
+@transaction.atomic
+def rebalance_shards(product: Product) -> int:
+    """
+    Even out the shards of a sharded product and refresh product.stock.
+
+    Checkouts drain shards unevenly; without rebalancing, buyers hit empty
+    shards and fall back to the locking multi-shard path.
+    """
+    shards = list(
+        StockShard.objects.select_for_update().filter(product=product).order_by('index')
+    )
+    if not shards:
+        return 0
+    total = sum(s.quantity for s in shards)
+    for shard, qty in zip(shards, _split(total, len(shards))):
+        shard.quantity = qty
+    StockShard.objects.bulk_update(shards, ['quantity'])
+    _store_stock(product.pk, total)
+    return total
@@ -0,0 +1,115 @@
+"""
+Concurrent checkout benchmark for plain vs sharded stock.
+Usage: python manage.py benchmark_checkout --product <uuid> [--threads 16] [--orders 400]
+
+Each worker thread runs checkout-style transactions that take one unit of
+stock from the product, first through the locked Product row and then
+through the stock shards. The product's stock mode and quantity are
+restored afterwards. Run it against PostgreSQL; SQLite serializes all
+writers and shows no difference.
+"""
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from products.inventory import (
+    disable_sharding,
+    enable_sharding,
+    reserve_stock,
+    set_sharded_stock,
+)
+from products.models import Product
+
+
+def _plain_checkout(product_id, quantity):
+    with transaction.atomic():
+        product = Product.objects.select_for_update().get(pk=product_id)
+        if product.stock < quantity:
+            return False
+        Product.objects.filter(pk=product_id).update(stock=product.stock - quantity)
+        return True
+
+
+def _sharded_checkout(product_id, quantity):
+    with transaction.atomic():
+        return reserve_stock(product_id, quantity)
+
+
+class Command(BaseCommand):
+    help = "Measure checkout throughput with and without sharded stock"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--product', required=True, help="Product id to benchmark on")
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--orders', type=int, default=400, help="Checkouts per mode")
+        parser.add_argument('--shards', type=int, default=None)
+
+    def handle(self, *args, **options):
+        try:
+            product = Product.objects.get(pk=options['product'])
+        except (Product.DoesNotExist, ValueError):
+            raise CommandError("Product not found.")
+
+        was_sharded = product.stock_sharded
+        if was_sharded:
+            product = disable_sharding(product)
+        original_stock = product.stock
+        orders = options['orders']
+        threads = options['threads']
+
+        try:
+            Product.objects.filter(pk=product.pk).update(stock=orders)
+            plain = self._run(_plain_checkout, product.pk, threads, orders)
+
+            Product.objects.filter(pk=product.pk).update(stock=orders)
+            product.refresh_from_db()
+            enable_sharding(product, options['shards'])
+            sharded = self._run(_sharded_checkout, product.pk, threads, orders)
+        finally:
+            product.refresh_from_db()
+            if product.stock_sharded:
+                set_sharded_stock(product, original_stock)
+                if not was_sharded:
+                    disable_sharding(product)
+            else:
+                Product.objects.filter(pk=product.pk).update(stock=original_stock)
+                if was_sharded:
+                    enable_sharding(product, options['shards'])
+
+        for label, (elapsed, ok) in (('plain', plain), ('sharded', sharded)):
+            rate = ok / elapsed if elapsed else 0
+            self.stdout.write(
+                f"  {label:8} {ok}/{orders} checkouts in {elapsed:.2f}s ({rate:.0f}/s)"
+            )
+        if plain[0] and sharded[0]:
+            self.stdout.write(self.style.SUCCESS(
+                f"Sharded throughput: {plain[0] / sharded[0]:.2f}x plain"
+            ))
+
+    def _run(self, checkout, product_id, threads, orders):
+        remaining = [orders]
+        succeeded = [0]
+        lock = threading.Lock()
+
+        def worker():
+            try:
+                while True:
+                    with lock:
+                        if not remaining[0]:
+                            return
+                        remaining[0] -= 1
+                    if checkout(product_id, 1):
+                        with lock:
+                            succeeded[0] += 1
+            finally:
+                connection.close()
+
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        started = time.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        return time.perf_counter() - started, succeeded[0]
@@ -0,0 +1,40 @@
+"""
+Even out StockShard rows and refresh Product.stock for sharded products.
+Usage: python manage.py rebalance_stock_shards [--product <uuid>] [--sync-only]
+
+Run periodically (e.g. every minute from cron) so the displayed stock stays
+close to the shard totals and checkouts keep hitting the lock-free path.
+--sync-only just copies the shard totals into Product.stock in one UPDATE
+without locking the shards, cheap enough to run more often than a rebalance.
+"""
+from django.core.management.base import BaseCommand
+
+from products.inventory import rebalance_shards, sync_product_stock
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = "Rebalance stock shards and sync Product.stock for sharded products"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--product', help="Only rebalance this product id")
+        parser.add_argument('--sync-only', action='store_true', help="Only refresh Product.stock from the shards")
+
+    def handle(self, *args, **options):
+        qs = Product.objects.filter(stock_sharded=True)
+        if options['product']:
+            qs = qs.filter(pk=options['product'])
+
+        if options['sync_only']:
+            ids = [options['product']] if options['product'] else None
+            count = sync_product_stock(ids)
+            self.stdout.write(self.style.SUCCESS(f"Synced stock of {count} sharded products."))
+            return
+
+        count = 0
+        for product in qs.only('id', 'name'):
+            total = rebalance_shards(product)
+            count += 1
+            self.stdout.write(f"  {product.name}: {total} in stock")
+
+        self.stdout.write(self.style.SUCCESS(f"Rebalanced {count} sharded products."))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_navbar_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='stock_sharded',
+            field=models.BooleanField(default=False, help_text='Keep stock in StockShard rows; stock is then a periodically synced sum'),
+        ),
+        migrations.CreateModel(
+            name='StockShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveSmallIntegerField()),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_shards', to='products.product')),
+            ],
+            options={
+                'ordering': ['product', 'index'],
+                'constraints': [models.UniqueConstraint(fields=('product', 'index'), name='unique_product_stock_shard')],
+            },
+        ),
+    ]
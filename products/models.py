@@ -105,6 +105,10 @@ class Product(models.Model):
         default=0,
         help_text="Available stock quantity for this product"
     )
+    stock_sharded = models.BooleanField(
+        default=False,
+        help_text="Keep stock in StockShard rows; stock is then a periodically synced sum"
+    )
     is_featured = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -175,6 +179,31 @@ class ProductImage(models.Model):
         ordering = ['order']
 
 
+class StockShard(models.Model):
+    """
+    One slice of a product's stock while the product is in sharded mode.
+
+    Checkouts decrement a random shard instead of the single Product row, so
+    concurrent buyers of a hot product mostly lock different rows.
+    """
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name='stock_shards'
+    )
+    index = models.PositiveSmallIntegerField()
+    quantity = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['product', 'index']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['product', 'index'], name='unique_product_stock_shard',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} #{self.index}: {self.quantity}"
+
+
 class Brand(models.Model):
     """
     Brand model for showcasing top brands on the homepage.
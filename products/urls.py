@@ -5,6 +5,8 @@ from . import views
 urlpatterns = [
     path('', views.ProductListView.as_view(), name='product-list'),
     path('search/', views.ProductSearchView.as_view(), name='product-search'),
+    # Must precede the identifier pattern, which would match 'batch'
+    path('batch/', views.ProductBatchView.as_view(), name='product-batch'),
     # Accept UUID or slug as identifier (frontend may use either)
     path('<str:identifier>/', views.ProductDetailView.as_view(), name='product-detail'),
     path('<str:identifier>/related/', views.ProductRelatedView.as_view(), name='product-related'),
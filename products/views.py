@@ -1,5 +1,7 @@
-from django.db.models import Q
-from django.shortcuts import get_object_or_404
+import uuid
+
+from django.db.models import Q, prefetch_related_objects
+from django.http import Http404
 from rest_framework import status
 from rest_framework.generics import ListAPIView, RetrieveAPIView
 from rest_framework.response import Response
@@ -7,6 +9,8 @@ from rest_framework.views import APIView
 
 from meta_pixel.service import meta_conversions
 
+from .identity import get_category, get_navbar_category, get_product
+from .inventory import available_stock, live_stock
 from .models import Brand, Category, NavbarCategory, Product
 from .serializers import (
     BrandSerializer,
@@ -56,25 +60,95 @@ class ProductListView(ListAPIView):
 class ProductDetailView(RetrieveAPIView):
     """Get single product by UUID or slug."""
     serializer_class = ProductDetailSerializer
-    queryset = Product.objects.filter(is_active=True).select_related('category', 'sub_category').prefetch_related('images')
     lookup_url_kwarg = 'identifier'
 
     def get_object(self):
-        identifier = self.kwargs.get(self.lookup_url_kwarg)
-        qs = self.get_queryset()
-        try:
-            import uuid
-
-            uuid.UUID(str(identifier))
-            return get_object_or_404(qs, id=identifier)
-        except Exception:
-            return get_object_or_404(qs, slug=identifier)
+        product = get_product(self.kwargs.get(self.lookup_url_kwarg))
+        if product is None:
+            raise Http404
+        prefetch_related_objects([product], 'images')
+        if product.stock_sharded:
+            product.stock = available_stock(product.id)
+        return product
 
     def retrieve(self, request, *args, **kwargs):
-        response = super().retrieve(request, *args, **kwargs)
         product = self.get_object()
+        serializer = self.get_serializer(product)
         meta_conversions.track_view_content(request, product)
-        return response
+        return Response(serializer.data)
+
+
+class ProductBatchView(APIView):
+    """
+    Resolve many products at once, e.g. to hydrate ids kept by the frontend.
+
+    ?ids=<uuid or slug>,... (max 50). Results keep the requested order;
+    unknown or inactive ids are listed in "missing". Stock is live (shard
+    totals for sharded products). ?detail=true returns the detail shape
+    with images. No tracking events are sent.
+    """
+    max_ids = 50
+
+    def get(self, request):
+        raw = [v.strip() for v in (request.query_params.get('ids') or '').split(',') if v.strip()]
+        if len(raw) > self.max_ids:
+            return Response(
+                {'ids': [f'At most {self.max_ids} ids per request.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        requested = list(dict.fromkeys(raw))
+        # Requested value -> lookup key (canonical UUID string or slug)
+        keys = {}
+        uuids, slugs = [], []
+        for value in requested:
+            try:
+                pk = uuid.UUID(value)
+            except ValueError:
+                keys[value] = value
+                slugs.append(value)
+            else:
+                keys[value] = str(pk)
+                uuids.append(pk)
+
+        detail = request.query_params.get('detail', '').lower() in ('1', 'true')
+        products = []
+        if requested:
+            qs = Product.objects.filter(
+                Q(id__in=uuids) | Q(slug__in=slugs), is_active=True,
+            ).select_related('category', 'sub_category')
+            if detail:
+                qs = qs.prefetch_related('images')
+            products = list(qs)
+
+        sharded = [p.id for p in products if p.stock_sharded]
+        if sharded:
+            totals = live_stock(sharded)
+            for p in products:
+                if p.stock_sharded:
+                    p.stock = totals.get(p.id, 0)
+
+        by_key = {}
+        for p in products:
+            by_key[str(p.id)] = p
+            by_key[p.slug] = p
+        found = []
+        missing = []
+        seen = set()
+        for value in requested:
+            if keys[value] in seen:
+                continue
+            seen.add(keys[value])
+            product = by_key.get(keys[value])
+            if product is None:
+                missing.append(value)
+            else:
+                found.append(product)
+
+        serializer_class = ProductDetailSerializer if detail else ProductListSerializer
+        return Response({
+            'results': serializer_class(found, many=True, context={'request': request}).data,
+            'missing': missing,
+        })
 
 
 class ProductRelatedView(ListAPIView):
@@ -82,15 +156,9 @@ class ProductRelatedView(ListAPIView):
     serializer_class = ProductListSerializer
 
     def get_queryset(self):
-        identifier = self.kwargs.get('identifier')
-        qs = Product.objects.filter(is_active=True)
-        try:
-            import uuid
-
-            uuid.UUID(str(identifier))
-            product = get_object_or_404(qs, id=identifier)
-        except Exception:
-            product = get_object_or_404(qs, slug=identifier)
+        product = get_product(self.kwargs.get('identifier'))
+        if product is None:
+            raise Http404
         return (
             Product.objects.filter(is_active=True, category=product.category)
             .exclude(id=product.id)
@@ -115,10 +183,12 @@ class NavbarCategoryListView(ListAPIView):
 class NavbarCategoryDetailView(RetrieveAPIView):
     """Get a single navbar category by slug, including its subcategories."""
     serializer_class = NavbarCategorySerializer
-    lookup_field = 'slug'
 
-    def get_queryset(self):
-        return NavbarCategory.objects.filter(is_active=True).prefetch_related('subcategories')
+    def get_object(self):
+        category = get_navbar_category(self.kwargs.get('slug'))
+        if category is None:
+            raise Http404
+        return category
 
 
 class CategoryListView(ListAPIView):
@@ -139,10 +209,12 @@ class CategoryListView(ListAPIView):
 class CategoryDetailView(RetrieveAPIView):
     """Get a single subcategory by slug."""
     serializer_class = CategorySerializer
-    lookup_field = 'slug'
 
-    def get_queryset(self):
-        return Category.objects.filter(is_active=True).select_related('navbar_category')
+    def get_object(self):
+        category = get_category(self.kwargs.get('slug'))
+        if category is None:
+            raise Http404
+        return category
 
 
 class SubcategoryListView(ListAPIView):
@@ -1,11 +1,13 @@
 from rest_framework import viewsets, mixins
 
 from config.permissions import IsStaffUser
+from core.export import ExportMixin
 from .models import WishlistItem
 from .admin_serializers import AdminWishlistItemSerializer
 
 
 class AdminWishlistItemViewSet(
+    ExportMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     viewsets.GenericViewSet,
@@ -13,3 +15,12 @@ class AdminWishlistItemViewSet(
     permission_classes = [IsStaffUser]
     serializer_class = AdminWishlistItemSerializer
     queryset = WishlistItem.objects.select_related('user', 'product').all()
+    export_filename = 'wishlist'
+    export_fields = {
+        'id': 'id',
+        'user': 'user__username',
+        'session_key': 'session_key',
+        'product_id': 'product_id',
+        'product_name': 'product__name',
+        'created_at': 'created_at',
+    }
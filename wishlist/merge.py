@@ -0,0 +1,36 @@
+"""Move a guest's session wishlist to the user who just logged in."""
+from django.db import transaction
+
+from core import counters
+
+from .models import WishlistItem
+
+
+@transaction.atomic
+def merge_session_wishlist(session_key: str, user) -> dict:
+    """
+    Give the session's wishlist entries to user.
+
+    Products the user has not saved yet are moved with one UPDATE; entries
+    that would violate unique_user_wishlist_item are deleted.
+    """
+    result = {'moved': 0, 'dropped': 0}
+    if not session_key:
+        return result
+    guest = WishlistItem.objects.filter(user=None, session_key=session_key)
+    guest_products = set(guest.values_list('product_id', flat=True))
+    if not guest_products:
+        return result
+    owned = set(
+        WishlistItem.objects.filter(user=user, product_id__in=guest_products)
+        .values_list('product_id', flat=True)
+    )
+
+    result['moved'] = guest.filter(product_id__in=guest_products - owned).update(
+        user=user, session_key='',
+    )
+    if owned:
+        with counters.suspend_counters():
+            result['dropped'], _ = guest.filter(product_id__in=owned).delete()
+        counters.adjust({'wishlist': -result['dropped']})
+    return result
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 
+from products.identity import get_product
 from products.serializers import ProductListSerializer
-from products.models import Product
 
 from .models import WishlistItem
 
@@ -18,6 +18,6 @@ class WishlistAddSerializer(serializers.Serializer):
     product_id = serializers.UUIDField()
 
     def validate_product_id(self, value):
-        if not Product.objects.filter(id=value, is_active=True).exists():
+        if get_product(value) is None:
             raise serializers.ValidationError('Product not found.')
         return value
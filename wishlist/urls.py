@@ -4,6 +4,7 @@ from . import views
 
 urlpatterns = [
     path('', views.WishlistListView.as_view(), name='wishlist-list'),
+    path('ids/', views.WishlistIdsView.as_view(), name='wishlist-ids'),
     path('add/', views.WishlistAddView.as_view(), name='wishlist-add'),
     path('remove/<uuid:product_id>/', views.WishlistRemoveView.as_view(), name='wishlist-remove'),
     path('clear/', views.WishlistClearView.as_view(), name='wishlist-clear'),
@@ -1,3 +1,7 @@
+import hashlib
+import uuid
+
+from django.utils.cache import patch_vary_headers
 from rest_framework import status
 from rest_framework.generics import ListAPIView
 from rest_framework.permissions import AllowAny
@@ -5,17 +9,24 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from meta_pixel.service import meta_conversions
-from products.models import Product
+from products.identity import get_product
 
 from .models import WishlistItem
 from .serializers import WishlistAddSerializer, WishlistItemSerializer
 
 
-def _wishlist_filter(request):
-    """Return a dict of kwargs to filter WishlistItem for the current visitor."""
+def _wishlist_filter(request, create_session=False):
+    """
+    Return a dict of kwargs to filter WishlistItem for the current visitor.
+
+    Anonymous visitors without a session get None unless create_session is
+    set (adding an item), so reads never create a session row.
+    """
     if request.user.is_authenticated:
         return {'user': request.user}
     if not request.session.session_key:
+        if not create_session:
+            return None
         request.session.create()
     return {'user': None, 'session_key': request.session.session_key}
 
@@ -26,11 +37,64 @@ class WishlistListView(ListAPIView):
     permission_classes = [AllowAny]
 
     def get_queryset(self):
+        filt = _wishlist_filter(self.request)
+        if filt is None:
+            return WishlistItem.objects.none()
         return WishlistItem.objects.filter(
-            **_wishlist_filter(self.request)
+            **filt
         ).select_related('product').prefetch_related('product__images')
 
 
+class WishlistIdsView(APIView):
+    """
+    Product ids in the current visitor's wishlist, for heart icons on grids.
+
+    ?products=<uuid>,<uuid> limits the answer to those products (max 100).
+    Served from the (owner, product) unique indexes; responses carry an
+    ETag and a matching If-None-Match gets 304 Not Modified.
+    """
+    permission_classes = [AllowAny]
+    max_products = 100
+
+    def get(self, request):
+        filt = _wishlist_filter(request)
+        ids = []
+        if filt is not None:
+            qs = WishlistItem.objects.filter(**filt)
+            wanted = _parse_product_ids(request.query_params.get('products'), self.max_products)
+            if wanted is not None:
+                qs = qs.filter(product_id__in=wanted)
+            ids = sorted(str(pid) for pid in qs.order_by().values_list('product_id', flat=True))
+
+        etag = '"%s"' % hashlib.blake2b(','.join(ids).encode(), digest_size=12).hexdigest()
+        if etag in _if_none_match(request):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response({'ids': ids})
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        patch_vary_headers(response, ('Cookie', 'Authorization'))
+        return response
+
+
+def _parse_product_ids(raw, limit):
+    """Valid UUIDs from a comma-separated list, or None when not given."""
+    if raw is None:
+        return None
+    ids = []
+    for value in raw.split(',')[:limit]:
+        try:
+            ids.append(uuid.UUID(value.strip()))
+        except ValueError:
+            continue
+    return ids
+
+
+def _if_none_match(request):
+    header = request.headers.get('If-None-Match', '')
+    return {tag.strip().removeprefix('W/') for tag in header.split(',') if tag.strip()}
+
+
 class WishlistAddView(APIView):
     """Add product to wishlist. Idempotent."""
     permission_classes = [AllowAny]
@@ -38,8 +102,8 @@ class WishlistAddView(APIView):
     def post(self, request):
         ser = WishlistAddSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
-        product = Product.objects.get(id=ser.validated_data['product_id'])
-        filt = _wishlist_filter(request)
+        product = get_product(ser.validated_data['product_id'])
+        filt = _wishlist_filter(request, create_session=True)
         _, created = WishlistItem.objects.get_or_create(product=product, **filt)
         if created:
             meta_conversions.track_add_to_wishlist(request, product)
@@ -54,8 +118,11 @@ class WishlistRemoveView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request, product_id):
+        filt = _wishlist_filter(request)
+        if filt is None:
+            return Response({'status': 'removed', 'deleted': False})
         deleted, _ = WishlistItem.objects.filter(
-            product_id=product_id, **_wishlist_filter(request)
+            product_id=product_id, **filt
         ).delete()
         return Response({'status': 'removed', 'deleted': deleted > 0})
 
@@ -65,7 +132,10 @@ class WishlistClearView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
+        filt = _wishlist_filter(request)
+        if filt is None:
+            return Response({'status': 'cleared', 'deleted': 0})
         deleted, _ = WishlistItem.objects.filter(
-            **_wishlist_filter(request)
+            **filt
         ).delete()
         return Response({'status': 'cleared', 'deleted': deleted})